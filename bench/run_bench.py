@@ -0,0 +1,311 @@
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, BENCH_DIR)
+
+# === End-to-end benchmark over the bundled label photos ===
+#   python bench/run_bench.py                       # run, compare with bench/baseline.json
+#   python bench/run_bench.py --save-baseline       # record a new baseline
+# openFDA and Gemini are served by bench/stub_server.py, so runs are offline
+# and repeatable; exit code 1 means a metric regressed past --tolerance.
+
+FIXTURES = ("res/meds/*.png", "res/meds/*.jpg", "output/medicine bottle_*.jpg")
+BENCH_OUTPUT = "results/bench/latest.json"
+BASELINE_FILE = "bench/baseline.json"
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 0.15   # Allowed relative slowdown before we flag a regression
+MIN_DELTA_MS = 2.0         # Ignore timing changes smaller than this (noise)
+
+def collect_fixtures():
+    images = set()
+    for pattern in FIXTURES:
+        images.update(glob.glob(pattern))
+    return sorted(images)
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def to_ms(seconds):
+    return round(seconds * 1000, 2)
+
+# =========================================================================
+# === COLD START (fresh interpreter) ===
+# =========================================================================
+
+def child_cold_start(image, use_index=False):
+    """
+    Runs in a subprocess: time imports, model loading and the first scan.
+    Caches start empty (and the label index is off unless use_index), so the
+    first scan really goes to the stub like the cold_cache pass does.
+    """
+    from metrics import peak_rss_bytes
+
+    started = time.perf_counter()
+    import service
+    imported = time.perf_counter()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        pipe = service.MedIdPipeline()
+        isolate_caches(pipe, cache_dir, use_index)
+        pipe.preload()
+        pipe.wait_ready()
+        loaded = time.perf_counter()
+        pipe.identify(image)
+        scanned = time.perf_counter()
+        pipe.close()
+
+    print(json.dumps({
+        "import_s": round(imported - started, 3),
+        "load_s": round(loaded - imported, 3),
+        "first_scan_s": round(scanned - loaded, 3),
+        "total_s": round(scanned - started, 3),
+        "peak_rss_bytes": peak_rss_bytes()
+    }))
+
+def cold_start(image, runs, use_index=False):
+    """Best of `runs` fresh-process starts (the child's stdout ends with one JSON line)"""
+    command = [sys.executable, os.path.abspath(__file__), "--child-cold-start", image]
+    if use_index:
+        command.append("--use-index")
+
+    samples = []
+    for _ in range(runs):
+        proc = subprocess.run(command, capture_output=True, text=True, cwd=ROOT)
+        if proc.returncode != 0:
+            print(f"✗ Cold start run failed:\n{proc.stderr[-2000:]}")
+            continue
+        samples.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    if not samples:
+        return None
+    return min(samples, key=lambda s: s["total_s"])
+
+# =========================================================================
+# === WARM PROCESS PASSES ===
+# =========================================================================
+
+def isolate_caches(pipe, directory, use_index=False):
+    """Point the pipeline at empty caches so every run starts from the same state"""
+    from fda_cache import LabelCache
+    from summary_cache import SummaryCache
+    from summarizer import get_summarizer
+
+    pipe.label_cache.close()
+    pipe.label_cache = LabelCache(os.path.join(directory, "fda_labels.sqlite"))
+    if pipe.label_index and not use_index:
+        pipe.label_index.close()
+        pipe.label_index = None
+    pipe.summary_cache = SummaryCache(os.path.join(directory, "summaries"))
+    pipe.summarizer = get_summarizer(summary_cache=pipe.summary_cache)
+
+def run_pass(pipe, images, repeat=1):
+    """Scan every image `repeat` times; per-scan latency plus the per-stage metrics"""
+    from metrics import METRICS, Histogram, peak_rss_bytes
+
+    METRICS.reset()
+    latency = Histogram()
+    identified = 0
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for image in images:
+            t = time.perf_counter()
+            result = pipe.identify(image)
+            latency.observe(time.perf_counter() - t)
+            identified += result.label is not None
+    wall = time.perf_counter() - started
+
+    stages = {}
+    for name, stats in METRICS.to_dict()["stages"].items():
+        wall_stats, cpu_stats = stats["wall_seconds"], stats["cpu_seconds"]
+        stages[name] = {
+            "count": wall_stats["count"],
+            "p50_ms": to_ms(wall_stats["p50"]),
+            "p95_ms": to_ms(wall_stats["p95"]),
+            "p99_ms": to_ms(wall_stats["p99"]),
+            "cpu_p50_ms": to_ms(cpu_stats["p50"]),
+            "process_cpu_p50_ms": to_ms(stats["process_cpu_seconds"]["p50"]),
+        }
+
+    lat = latency.to_dict()
+    return {
+        "scans": latency.count,
+        "identified": identified,
+        "wall_s": round(wall, 3),
+        "throughput_ips": round(latency.count / wall, 3) if wall > 0 else 0.0,
+        "latency_ms": {
+            "mean": to_ms(lat["sum"] / lat["count"]) if lat["count"] else 0.0,
+            "p50": to_ms(lat["p50"]),
+            "p95": to_ms(lat["p95"]),
+            "p99": to_ms(lat["p99"]),
+        },
+        "stages": stages,
+        "peak_rss_bytes": peak_rss_bytes()
+    }
+
+# =========================================================================
+# === BASELINE COMPARISON ===
+# =========================================================================
+
+def flatten(report):
+    """{metric_path: (value, higher_is_better)} for everything we gate on; timings in ms"""
+    metrics = {}
+    cold = report.get("cold_start") or {}
+    for key in ("import", "load", "first_scan"):
+        if f"{key}_s" in cold:
+            metrics[f"cold_start.{key}_ms"] = (cold[f"{key}_s"] * 1000, False)
+
+    for pass_name, data in report.get("passes", {}).items():
+        metrics[f"{pass_name}.throughput_ips"] = (data["throughput_ips"], True)
+        for q in ("p50", "p95"):
+            metrics[f"{pass_name}.latency_ms.{q}"] = (data["latency_ms"][q], False)
+        for stage, stats in data["stages"].items():
+            metrics[f"{pass_name}.stages.{stage}.p50_ms"] = (stats["p50_ms"], False)
+        metrics[f"{pass_name}.peak_rss_mib"] = (data["peak_rss_bytes"] / (1024 * 1024), False)
+    return metrics
+
+def compare(report, baseline, tolerance):
+    """List of (metric, baseline, current, change) that got worse than tolerance"""
+    current, previous = flatten(report), flatten(baseline)
+    regressions = []
+    for name, (value, higher_is_better) in current.items():
+        if name not in previous:
+            continue
+        base = previous[name][0]
+        if base <= 0:
+            continue
+
+        change = (value - base) / base
+        if higher_is_better:
+            worse = change < -tolerance
+        else:
+            is_timing = "_ms" in name
+            worse = change > tolerance and (not is_timing or value - base >= MIN_DELTA_MS)
+        if worse:
+            regressions.append((name, base, value, change))
+    return regressions
+
+def print_report(report):
+    cold = report.get("cold_start")
+    if cold:
+        print(f"\n🧊 Cold start: import {cold['import_s']}s | load {cold['load_s']}s | "
+              f"first scan {cold['first_scan_s']}s | peak RSS {cold['peak_rss_bytes'] / (1024 * 1024):.0f} MiB")
+
+    for pass_name, data in report["passes"].items():
+        lat = data["latency_ms"]
+        print(f"\n🔥 {pass_name}: {data['scans']} scans in {data['wall_s']}s = {data['throughput_ips']} img/s | "
+              f"p50 {lat['p50']}ms p95 {lat['p95']}ms p99 {lat['p99']}ms | "
+              f"peak RSS {data['peak_rss_bytes'] / (1024 * 1024):.0f} MiB")
+        print(f"{'STAGE':<18} | {'CALLS':>5} | {'P50 ms':>8} | {'P95 ms':>8} | {'P99 ms':>8} | "
+              f"{'CPU P50':>8} | {'PROC P50':>8}")
+        print("-" * 81)
+        for name, s in data["stages"].items():
+            print(f"{name:<18} | {s['count']:>5} | {s['p50_ms']:>8} | {s['p95_ms']:>8} | "
+                  f"{s['p99_ms']:>8} | {s['cpu_p50_ms']:>8} | {s['process_cpu_p50_ms']:>8}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Med-ID pipeline against a stubbed openFDA/Gemini")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Warm passes over the fixtures")
+    parser.add_argument("--cold-runs", type=int, default=1, help="Fresh-process starts to time (0 to skip)")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Simulated FDA/Gemini round trip")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--summarizer", default="gemini", choices=["gemini", "extractive"])
+    parser.add_argument("--use-index", action="store_true", help="Keep the local openFDA label index")
+    parser.add_argument("--out", default=BENCH_OUTPUT)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--child-cold-start", metavar="IMAGE", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    if args.child_cold_start:
+        child_cold_start(args.child_cold_start, args.use_index)
+        return
+
+    images = collect_fixtures()
+    if not images:
+        print("❌ No fixture images found")
+        sys.exit(1)
+
+    from stub_server import StubServer
+    stub = StubServer(port=args.port, latency_ms=args.latency_ms).start()
+    # Must be in place before api_client is imported (it reads them at import time)
+    os.environ.update(stub.environment())
+    os.environ["MEDID_SUMMARIZER"] = args.summarizer
+    print(f"✅ Stub server on {stub.url} ({args.latency_ms:.0f} ms latency), {len(images)} fixture images")
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": int(time.time()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "images": len(images),
+            "repeat": args.repeat,
+            "stub_latency_ms": args.latency_ms,
+            "summarizer": args.summarizer
+        },
+        "cold_start": cold_start(images[0], args.cold_runs, args.use_index) if args.cold_runs > 0 else None,
+        "passes": {}
+    }
+
+    from service import MedIdPipeline
+    pipe = MedIdPipeline()
+    pipe.wait_ready()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        isolate_caches(pipe, cache_dir, args.use_index)
+        # First pass: warm process but empty caches and first-inference overheads
+        report["passes"]["cold_cache"] = run_pass(pipe, images)
+        # Later passes: steady state, FDA labels and summaries cached
+        report["passes"]["warm"] = run_pass(pipe, images, repeat=args.repeat)
+        pipe.close()
+    report["meta"]["stub_requests"] = dict(stub.requests)
+    stub.stop()
+
+    print_report(report)
+
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+    print(f"\n💾 Report saved to: {args.out}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4)
+        print(f"💾 Baseline saved to: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"⚠️ No baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    regressions = compare(report, baseline, args.tolerance)
+    if not regressions:
+        print(f"✅ No regressions vs baseline ({baseline['meta'].get('commit')}, tolerance {args.tolerance:.0%})")
+        return
+
+    print(f"\n❌ {len(regressions)} regression(s) vs baseline ({baseline['meta'].get('commit')}):")
+    for name, base, value, change in regressions:
+        print(f"  ✗ {name}: {base:.2f} -> {value:.2f} ({change:+.0%})")
+    sys.exit(1)
+
+if __name__ == "__main__":
+    main()
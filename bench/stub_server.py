@@ -0,0 +1,136 @@
+import argparse
+import asyncio
+import os
+import sys
+import threading
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from vocabulary import ALL_DRUGS
+
+# === Local stand-in for openFDA and Gemini, so benchmarks never hit the network ===
+#   python bench/stub_server.py --port 8765 --latency-ms 50
+# then OPEN_FDA_URL=http://127.0.0.1:8765/drug/label.json
+#      GEMINI_BASE_URL=http://127.0.0.1:8765 GEMINI_KEY=stub
+
+DEFAULT_PORT = 8765
+DEFAULT_LATENCY_MS = 50  # Simulated network round trip per request
+
+KNOWN_DRUGS = {name.lower() for name in ALL_DRUGS}
+
+STUB_SUMMARY = (
+    "- Relieves the symptoms it is indicated for.\n"
+    "- Take as directed on the label.\n"
+    "- Ask a doctor before use if you have other conditions."
+)
+
+def fake_label(drug_name):
+    """Deterministic openFDA-shaped label with realistically sized fields"""
+    name = drug_name.strip().title()
+    filler = f"{name} should be used exactly as directed by your healthcare provider. " * 20
+    return {
+        "openfda": {"brand_name": [name.upper()], "generic_name": [name.upper()]},
+        "purpose": [f"Purpose {name} relieves minor aches and pains."],
+        "indications_and_usage": [f"1 INDICATIONS AND USAGE {name} is indicated for symptomatic relief. {filler}"],
+        "dosage_and_administration": [f"2 DOSAGE AND ADMINISTRATION Take one tablet of {name} daily. {filler}"],
+    }
+
+class StubServer:
+    """aiohttp app serving /drug/label.json and Gemini's generateContent"""
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT, latency_ms=DEFAULT_LATENCY_MS):
+        self.host = host
+        self.port = port
+        self.latency = latency_ms / 1000
+        self.requests = {"fda": 0, "gemini": 0}
+        self.loop = None
+        self.runner = None
+        self.thread = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    async def handle_label(self, request):
+        self.requests["fda"] += 1
+        await asyncio.sleep(self.latency)
+
+        search = request.query.get("search", "").strip().strip('"')
+        if search.lower() not in KNOWN_DRUGS:
+            return web.json_response({"error": {"code": "NOT_FOUND", "message": "No matches found!"}}, status=404)
+        return web.json_response({"meta": {"results": {"total": 1}}, "results": [fake_label(search)]})
+
+    async def handle_generate(self, request):
+        self.requests["gemini"] += 1
+        if not request.match_info["action"].endswith(":generateContent"):
+            return web.json_response({"error": {"code": 404, "message": "Unknown method"}}, status=404)
+
+        await request.read()
+        await asyncio.sleep(self.latency)
+        return web.json_response({
+            "candidates": [{
+                "content": {"parts": [{"text": STUB_SUMMARY}], "role": "model"},
+                "finishReason": "STOP",
+                "index": 0
+            }]
+        })
+
+    def build_app(self):
+        app = web.Application()
+        app.router.add_get("/drug/label.json", self.handle_label)
+        app.router.add_post("/{version}/models/{action}", self.handle_generate)
+        return app
+
+    async def serve(self):
+        self.runner = web.AppRunner(self.build_app(), access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.host, self.port).start()
+
+    def start(self):
+        """Serve from a background thread (own event loop); returns once listening"""
+        ready = threading.Event()
+
+        def run():
+            self.loop = asyncio.new_event_loop()
+            self.loop.run_until_complete(self.serve())
+            ready.set()
+            self.loop.run_forever()
+
+        self.thread = threading.Thread(target=run, name="medid-stub", daemon=True)
+        self.thread.start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        if self.loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop = None
+
+    def environment(self):
+        """Env vars that point api_client at this server"""
+        return {
+            "OPEN_FDA_URL": f"{self.url}/drug/label.json",
+            "GEMINI_BASE_URL": self.url,
+            "GEMINI_KEY": "stub",
+            "MEDID_OFFLINE": "0",
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub openFDA + Gemini server for benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency-ms", type=float, default=DEFAULT_LATENCY_MS)
+    args = parser.parse_args()
+
+    server = StubServer(args.host, args.port, args.latency_ms)
+    print(f"✅ Stub server on {server.url}")
+    for name, value in server.environment().items():
+        print(f"   {name}={value}")
+    web.run_app(server.build_app(), host=args.host, port=args.port, print=None)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from detector import BACKEND_WEIGHTS, DETECTOR_IMGSZ, DETECTOR_WEIGHTS
+
+# === Export the bottle detector for CPU runtimes and benchmark the backends ===
+#   python setup/export_detector.py export            # all backends
+#   python setup/export_detector.py export onnx-int8
+#   python setup/export_detector.py bench
+# Pick one at runtime with MEDID_DETECTOR_BACKEND=<backend>.
+# The ONNX/OpenVINO runtimes are optional: pip install -r requirements-detector.txt
+
+DATA_YAML = "dataset/data.yaml"          # Roboflow layout, see test/download.sh
+BENCH_IMAGES = "dataset/valid/images"
+BENCH_OUTPUT = "results/bench/detector_backends.json"
+WARMUP_RUNS = 5
+CALIBRATION_SPLIT = "val"   # DATA_YAML split the INT8 activation ranges are calibrated on
+CALIBRATION_IMAGES = 200
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+def export_onnx():
+    from ultralytics import YOLO
+    path = YOLO(DETECTOR_WEIGHTS).export(format="onnx", imgsz=DETECTOR_IMGSZ, simplify=True)
+    return str(path)
+
+def split_images(split=CALIBRATION_SPLIT, limit=CALIBRATION_IMAGES):
+    """Image paths of a DATA_YAML split (Roboflow writes them relative to the yaml)"""
+    import yaml
+
+    with open(DATA_YAML, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f)
+
+    root = data.get("path") or os.path.dirname(DATA_YAML)
+    entry = data[split]
+    for directory in (os.path.join(root, entry), os.path.join(root, entry.lstrip("./"))):
+        if os.path.isdir(directory):
+            images = [os.path.join(directory, name) for name in sorted(os.listdir(directory))
+                      if name.lower().endswith(IMAGE_EXTENSIONS)]
+            return images[:limit]
+    raise FileNotFoundError(f"'{split}' images from {DATA_YAML} not found under {root}")
+
+def letterbox(frame, size=DETECTOR_IMGSZ):
+    """Same preprocessing Ultralytics feeds the exported model: letterboxed RGB, CHW, 0-1"""
+    import cv2
+
+    h, w = frame.shape[:2]
+    scale = min(size / h, size / w)
+    new_w, new_h = round(w * scale), round(h * scale)
+    resized = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+
+    canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+    top, left = (size - new_h) // 2, (size - new_w) // 2
+    canvas[top:top + new_h, left:left + new_w] = resized
+    return (canvas[..., ::-1].transpose(2, 0, 1)[None] / 255.0).astype(np.float32)
+
+class CalibrationReader:
+    """onnxruntime CalibrationDataReader over the calibration split, one image per batch"""
+
+    def __init__(self, input_name, images):
+        self.input_name = input_name
+        self.images = images
+        self.position = 0
+
+    def get_next(self):
+        import cv2
+
+        while self.position < len(self.images):
+            frame = cv2.imread(self.images[self.position])
+            self.position += 1
+            if frame is not None:
+                return {self.input_name: letterbox(frame)}
+        return None
+
+    def rewind(self):
+        self.position = 0
+
+def export_onnx_int8():
+    """
+    Static INT8 quantization of the ONNX export (QDQ, per-channel weights).
+    Activation ranges are calibrated on images from the DATA_YAML split.
+    """
+    import onnxruntime
+    from onnxruntime.quantization import QuantFormat, QuantType, quantize_static
+
+    source = BACKEND_WEIGHTS["onnx"]
+    if not os.path.exists(source):
+        source = export_onnx()
+
+    images = split_images()
+    print(f"📦 Calibrating on {len(images)} '{CALIBRATION_SPLIT}' images")
+    input_name = onnxruntime.InferenceSession(source, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+    quantize_static(source, BACKEND_WEIGHTS["onnx-int8"], CalibrationReader(input_name, images),
+                    quant_format=QuantFormat.QDQ, per_channel=True,
+                    activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8)
+    return BACKEND_WEIGHTS["onnx-int8"]
+
+def export_openvino():
+    from ultralytics import YOLO
+    path = YOLO(DETECTOR_WEIGHTS).export(format="openvino", imgsz=DETECTOR_IMGSZ)
+    return str(path)
+
+def export_openvino_int8():
+    """Post-training INT8 via NNCF, calibrated on the dataset split"""
+    from ultralytics import YOLO
+    path = YOLO(DETECTOR_WEIGHTS).export(format="openvino", imgsz=DETECTOR_IMGSZ, int8=True, data=DATA_YAML)
+    return str(path)
+
+EXPORTERS = {
+    "onnx": export_onnx,
+    "onnx-int8": export_onnx_int8,
+    "openvino": export_openvino,
+    "openvino-int8": export_openvino_int8,
+}
+
+def export(backends):
+    for backend in backends:
+        try:
+            print(f"📦 Exporting {backend}...")
+            print(f"✅ {backend}: {EXPORTERS[backend]()}")
+        except Exception as e:
+            print(f"❌ {backend} export failed: {e}")
+
+def measure_latency(model, images):
+    """Per-image latency in ms, after a few warm-up runs"""
+    import cv2
+
+    frames = [cv2.imread(path) for path in images]
+    frames = [f for f in frames if f is not None]
+    if not frames:
+        return []
+
+    for frame in frames[:WARMUP_RUNS]:
+        model(frame, imgsz=DETECTOR_IMGSZ, conf=0.5, iou=0.4, verbose=False)
+
+    timings = []
+    for frame in frames:
+        start = time.perf_counter()
+        model(frame, imgsz=DETECTOR_IMGSZ, conf=0.5, iou=0.4, verbose=False)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+def bench(backends, limit, split):
+    from ultralytics import YOLO
+
+    images = sorted(glob.glob(os.path.join(BENCH_IMAGES, "*.jpg")))[:limit]
+    if not images:
+        print(f"❌ No images found in {BENCH_IMAGES}")
+        return
+
+    report = {}
+    for backend in backends:
+        path = BACKEND_WEIGHTS[backend]
+        if not os.path.exists(path):
+            print(f"✗ Skipping {backend}: {path} not exported")
+            continue
+
+        print(f"\n⏱️  Benchmarking {backend}...")
+        model = YOLO(path, task="detect")
+        timings = measure_latency(model, images)
+        metrics = model.val(data=DATA_YAML, split=split, imgsz=DETECTOR_IMGSZ, device="cpu",
+                            batch=1, plots=False, verbose=False)
+
+        report[backend] = {
+            "weights": path,
+            "images": len(timings),
+            "latency_ms_mean": round(float(np.mean(timings)), 2),
+            "latency_ms_p50": round(float(np.percentile(timings, 50)), 2),
+            "latency_ms_p95": round(float(np.percentile(timings, 95)), 2),
+            "map50": round(float(metrics.box.map50), 4),
+            "map50_95": round(float(metrics.box.map), 4),
+        }
+
+    if not report:
+        return
+
+    print(f"\n{'BACKEND':<15} | {'MEAN ms':>8} | {'P95 ms':>8} | {'mAP50':>7} | {'mAP50-95':>8}")
+    print("-" * 60)
+    for backend, row in report.items():
+        print(f"{backend:<15} | {row['latency_ms_mean']:>8} | {row['latency_ms_p95']:>8} | "
+              f"{row['map50']:>7} | {row['map50_95']:>8}")
+
+    os.makedirs(os.path.dirname(BENCH_OUTPUT), exist_ok=True)
+    with open(BENCH_OUTPUT, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+    print(f"\n💾 Report saved to: {BENCH_OUTPUT}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Export and benchmark the YOLO bottle detector")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    # choices= is checked manually: argparse tests a nargs="*" default (or
+    # the empty list) against the choices and rejects a bare `export`/`bench`
+    p_export = sub.add_parser("export", help="Export CPU backends next to best.pt")
+    p_export.add_argument("backends", nargs="*", metavar="backend",
+                          help=f"Any of {', '.join(EXPORTERS)} (default: all)")
+
+    p_bench = sub.add_parser("bench", help="Compare latency and mAP across backends")
+    p_bench.add_argument("backends", nargs="*", metavar="backend",
+                         help=f"Any of {', '.join(BACKEND_WEIGHTS)} (default: all)")
+    p_bench.add_argument("--limit", type=int, default=100, help="Images used for latency")
+    p_bench.add_argument("--split", default="val", help="Dataset split for mAP")
+
+    args = parser.parse_args()
+    known = list(EXPORTERS) if args.command == "export" else list(BACKEND_WEIGHTS)
+    unknown = [b for b in args.backends if b not in known]
+    if unknown:
+        parser.error(f"unknown backend(s) {', '.join(unknown)} (choose from {', '.join(known)})")
+    backends = args.backends or known
+
+    if args.command == "export":
+        export(backends)
+    else:
+        bench(backends, args.limit, args.split)
+
+if __name__ == "__main__":
+    main()
@@ -2,67 +2,24 @@ import random
 import json
 import os
 import re
+import sys
 from typing import List, Tuple
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from vocabulary import (ALL_DRUGS, DECEPTIVE_WORDS, FORMS, LABEL_HEADERS, MANUFACTURERS,
+                        PHARMACY_NAMES)
+
 os.makedirs("data", exist_ok=True)
 
 # === EXPANDED DATA LISTS ===
-ALL_DRUGS = [
-    "Lisinopril", "Paracetamol", "Acetaminophen", "Ibuprofen", "Amoxicillin",
-    "Metformin", "Atorvastatin", "Amlodipine", "Omeprazole", "Azithromycin",
-    "Ciprofloxacin", "Cetirizine", "Loratadine", "Prednisone", "Ondansetron",
-    "Simvastatin", "Losartan", "Hydroxyzine", "Doxycycline", "Clopidogrel",
-    "Fluconazole", "Gabapentin", "Metoprolol", "Levothyroxine", "Alprazolam",
-    "Tramadol", "Clonazepam", "Escitalopram", "Furosemide", "Trazodone",
-    "Albuterol", "Pantoprazole", "Montelukast", "Fluticasone", "Sertraline",
-    "Rosuvastatin", "Aspirin", "Meloxicam", "Duloxetine", "Tamsulosin",
-    "Spironolactone", "Clindamycin", "Diclofenac", "Atenolol", "Naproxen",
-    "Methylprednisolone", "Finasteride", "Sitagliptin", "Celecoxib", "Donepezil",
-    "Oxycodone", "Hydromorphone", "Warfarin", "Apixaban", "Rivaroxaban",
-    "Insulin", "Glipizide", "Famotidine", "Hydrochlorothiazide", "Triamcinolone",
-    "Lovastatin", "Pravastatin", "Mirtazapine", "Risperidone", "Quetiapine",
-    "Olanzapine", "Aripiprazole", "Lamotrigine", "Topiramate", "Pregabalin"
-]
+# Drugs, manufacturers, label headers, pharmacy names, look-alike words and
+# forms live in src/vocabulary.py (shared with the runtime pre-filter)
 
 CORRUPTED_DRUGS = [
     "Paratecamol", "Metforrmin", "Omepprazole", "Lisinorpil",
     "Atorvasttin", "Gabapentln", "Metroprolol", "Ibuprofin"
 ]
 
-MANUFACTURERS = [
-    "Chen", "Pfizer", "Novartis", "GSK", "Merck", "Sanofi", "Bayer", "Roche", 
-    "AstraZeneca", "Johnson", "Bristol", "Teva", "Sandoz", "Mylan", "Sun", 
-    "Lupin", "Aurobindo", "Cipla", "Hikma", "Amneal", "Glenmark", "Zydus",
-    "Torrent", "AbbVie", "Gilead", "Amgen", "Lilly", "Nordisk", "Boehringer",
-    "Takeda", "Viatris", "Organon", "Perrigo", "Apotex", "Bausch", "Biocon"
-]
-
-# === CRITICAL: Label Header Words ===
-LABEL_HEADERS = [
-    "Pharmacy", "Store", "Clinic", "Hospital", "Center", "Rx", "Date", 
-    "Filled", "Refill", "Qty", "Quantity", "Doctor", "Patient", "Name",
-    "Address", "Phone", "Fax", "Tel", "Prescription", "Order", "Number",
-    "Discard", "Expiry", "Batch", "Lot", "NDC", "DIN", "License",
-    "Directions", "Instructions", "Dosage", "Take", "Use", "Warning",
-    "Caution", "Storage", "Keep", "Contains", "Active", "Inactive",
-    "Ingredient", "Manufactured", "Distributed", "Packaged", "By"
-]
-
-# === Common Pharmacy/Store Names (NOT DRUGS!) ===
-PHARMACY_NAMES = [
-    "CVS", "Walgreens", "Rite Aid", "Walmart", "Target", "Kroger",
-    "Safeway", "Publix", "Costco", "Sam's Club", "Albertsons", "HEB",
-    "Duane Reade", "Health Mart", "Good Neighbor", "Medicine Shoppe"
-]
-
-# === Common Words That Look Like Drugs (NOT DRUGS!) ===
-DECEPTIVE_WORDS = [
-    "Store", "Health", "Care", "Medical", "Wellness", "Family", 
-    "Community", "Express", "Plus", "Prime", "Central", "Main",
-    "Street", "Avenue", "Plaza", "Mall", "Building", "Suite",
-    "North", "South", "East", "West", "City", "Town", "Village"
-]
-
 DOSAGES = [
     "5 mg", "10 mg", "25 mg", "50 mg", "100 mg", "250 mg", "500 mg",
     "5mg", "10mg", "25mg", "50mg", "100mg", "200mg", "500mg",
@@ -71,12 +28,6 @@ DOSAGES = [
     "50 mcg", "100 mcg", "200 mcg", "5 ml", "10 ml", "100 ml"
 ]
 
-FORMS = [
-    "tablet", "tablets", "tab", "tabs", "capsule", "capsules", "caps",
-    "syrup", "ointment", "cream", "injection", "drops", "caplet",
-    "pill", "pills", "suspension", "solution", "liquid", "gel"
-]
-
 STRENGTHS = ["ER", "XR", "SR", "Forte", "IR", "CR", "DR", "LA", "XL"]
 
 
@@ -1,18 +1,24 @@
-import requests
+import asyncio
 import os
 import json
 import sys
-# Import the correct client (new SDK) and error handling
-from google import genai 
-from google.genai.errors import APIError
+import threading
+
+from fda_cache import LabelCache
+from label_index import LabelIndex
+from metrics import stage
+from summary_cache import SummaryCache
+from results import Label
 
 # Global variables to hold the client and its status
+# (google.genai is only imported once a GEMINI_KEY is actually configured)
+genai = None
 gemini_client = None
 HAS_GEMINI = False
 
 def setup_gemini():
     """Initializes the Gemini API client."""
-    global gemini_client, HAS_GEMINI
+    global genai, gemini_client, HAS_GEMINI
 
     try:
         # NOTE: Using "GEMINI_API_KEY" is standard, but the user's setup might be using "GEMINI_KEY"
@@ -22,9 +28,16 @@ def setup_gemini():
             print("⚠️ GEMINI_KEY not found in environment. LLM summarization disabled.")
             HAS_GEMINI = False
             return
-            
-        # Initialize the client using the key
-        gemini_client = genai.Client(api_key=api_key)
+
+        from google import genai as google_genai
+        genai = google_genai
+
+        # Initialize the client using the key (GEMINI_BASE_URL points it at a proxy or the bench stub)
+        base_url = os.getenv("GEMINI_BASE_URL")
+        if base_url:
+            gemini_client = genai.Client(api_key=api_key, http_options=genai.types.HttpOptions(base_url=base_url))
+        else:
+            gemini_client = genai.Client(api_key=api_key)
         HAS_GEMINI = True
         print("✅ Gemini Initialized...")
         
@@ -33,15 +46,47 @@ def setup_gemini():
         HAS_GEMINI = False
 
 
-def generate_summary(drug_name, purpose, indications, dosage):
+GEMINI_MODEL = 'gemini-2.5-flash' # Use the fast model for summarization
+
+# The System Instruction (The instruction for the LLM)
+SYSTEM_INSTRUCTION = """
+You rewrite FDA drug label data into a strict, concise 3-bullet summary.
+
+Rules:
+1. Do NOT add explanations, context, or details not present in the raw text.
+2. Do NOT exceed 1 short sentence per bullet.
+3. Do NOT restate chemical classes, history, or mechanism unless explicitly in the raw text.
+4. Do NOT expand acronyms.
+5. Preserve meaning strictly; do not speculate.
+6. Output format must be EXACTLY:
+
+• Purpose: <1 short sentence from raw PURPOSE>
+• Indications: <1 short sentence from raw INDICATIONS AND USAGE>
+• Dosage: <1 short sentence from raw DOSAGE AND ADMINISTRATION>
+
+No intro text. No conclusion. No markdown. No bold formatting.
+"""
+
+def generate_summary(drug_name, purpose, indications, dosage, cache=None):
     """
     Sends structured drug information to the Gemini model for summarization.
+    With a SummaryCache, identical label content is only ever summarized once.
     """
     global gemini_client, HAS_GEMINI
 
     if not HAS_GEMINI:
         return "LLM summarization skipped: Gemini API client not available."
-    
+
+    from google.genai.errors import APIError
+
+    key = None
+    if cache is not None:
+        key = SummaryCache.make_key(GEMINI_MODEL, SYSTEM_INSTRUCTION, drug_name, purpose, indications, dosage)
+        cached = cache.get(key)
+        if cached is not None:
+            print("\n\n📦 Using cached summary")
+            return cached
+
     # 1. Format the data into a single, comprehensive string for the LLM
     drug_info_text = f"""
     DRUG NAME: {drug_name}
@@ -56,40 +101,22 @@ def generate_summary(drug_name, purpose, indications, dosage):
     {dosage}
     """
 
-    # 2. Define the System Instruction (The instruction for the LLM)
-    system_instruction = """
-You rewrite FDA drug label data into a strict, concise 3-bullet summary.
-
-Rules:
-1. Do NOT add explanations, context, or details not present in the raw text.
-2. Do NOT exceed 1 short sentence per bullet.
-3. Do NOT restate chemical classes, history, or mechanism unless explicitly in the raw text.
-4. Do NOT expand acronyms.
-5. Preserve meaning strictly; do not speculate.
-6. Output format must be EXACTLY:
-
-• Purpose: <1 short sentence from raw PURPOSE>
-• Indications: <1 short sentence from raw INDICATIONS AND USAGE>
-• Dosage: <1 short sentence from raw DOSAGE AND ADMINISTRATION>
-
-No intro text. No conclusion. No markdown. No bold formatting.
-"""
-
     print("\n\n🧠 Sending data to Gemini for summarization...")
-    
+
     try:
-        # 3. Call the Gemini API using gemini-2.5-flash
-        response = gemini_client.models.generate_content(
-            model='gemini-2.5-flash', # Use the fast model for summarization
-            contents=[drug_info_text],
-            config=genai.types.GenerateContentConfig(
-                system_instruction=system_instruction,
-                temperature=0.2 # Keep the output factual
+        # 2. Call the Gemini API
+        with stage("gemini_http"):
+            response = gemini_client.models.generate_content(
+                model=GEMINI_MODEL,
+                contents=[drug_info_text],
+                config=genai.types.GenerateContentConfig(
+                    system_instruction=SYSTEM_INSTRUCTION,
+                    temperature=0.2 # Keep the output factual
+                )
             )
-        )
 
-        # 4. Extract and return the summary text
-        return response.text
+        # 3. Extract the summary text
+        summary = response.text
 
     except APIError as e:
         print(f"✗ Error during Gemini API call: {e}")
@@ -98,76 +125,262 @@ No intro text. No conclusion. No markdown. No bold formatting.
         print(f"✗ An unexpected error occurred during summarization: {e}")
         return "Failed"
 
-# =========================================================================
-# === START SCRIPT EXECUTION ===
-# =========================================================================
-
-# Load the filtered text
-with open("results/filter/output_next.json", "r", encoding="utf-8") as f:
-    filtered_text = json.load(f)
+    # 4. Cache it; a failed write must not throw away a good summary
+    if key is not None and summary:
+        try:
+            cache.put(key, summary)
+        except OSError as e:
+            print(f"⚠️ Could not cache summary: {e}")
+    return summary
 
-# Initialize Gemini before any data processing
-setup_gemini() 
+FDA_URL = os.getenv("OPEN_FDA_URL", "https://api.fda.gov/drug/label.json")
+FILTER_OUTPUT_FILE = "results/filter/output_next.json"
 
-# Extract the drug name from the list
-data = [item["text"] for item in filtered_text]
-if len(data) == 0:
-    print("No data passed, please try again")
-    sys.exit()
+# Set MEDID_OFFLINE=1 to resolve labels from the local index only (air-gapped clinics)
+OFFLINE = os.getenv("MEDID_OFFLINE", "0") == "1"
 
-# Extract the drug name for searching
-drug_name = data[0]
-
-print(f"Searching for drug: {drug_name}")
-api_key = os.getenv("OPEN_FDA_KEY")
+def extract_fields(result):
+    """Pull (brand, purpose, indications, dosage) out of an openFDA label result"""
+    found_brand = result.get("openfda", {}).get("brand_name", ["N/A"])[0]
 
+    raw_purpose = result.get("purpose", ["N/A"])[0]
+    raw_indications = result.get("indications_and_usage", ["N/A"])[0]
+    raw_dosage = result.get("dosage_and_administration", ["N/A"])[0]
 
-url = "https://api.fda.gov/drug/label.json"
+    return found_brand, raw_purpose, raw_indications, raw_dosage
 
-# Construct a targeted search query
-search_query = f'{drug_name}'
+def build_label(drug_name, result, summary_cache=None, summarizer=None):
+    """
+    Turn one openFDA result into a Label and summarize it.
+    `summarizer` is any summarizer.Summarizer backend; without one the
+    Gemini generate_summary call is used directly.
+    """
+    # 1. Extract the raw data
+    found_brand, raw_purpose, raw_indications, raw_dosage = extract_fields(result)
 
-params = {
-    "search": search_query, 
-    "limit": 1,
-    "api_key": api_key
-}
+    # 2. Call the Summarization Function
+    with stage("summary"):
+        if summarizer is not None:
+            summary_text, summarizer_name = summarizer.summarize_with_backend(
+                found_brand, raw_purpose, raw_indications, raw_dosage
+            )
+        else:
+            summary_text = generate_summary(
+                drug_name=found_brand,
+                purpose=raw_purpose,
+                indications=raw_indications,
+                dosage=raw_dosage,
+                cache=summary_cache
+            )
+            # Skipped or failed calls return a message, not a Gemini summary
+            summarizer_name = "gemini" if HAS_GEMINI and summary_text != "Failed" else "none"
 
+    return Label(
+        query=drug_name,
+        brand_name=found_brand,
+        purpose=raw_purpose,
+        indications_and_usage=raw_indications,
+        dosage_and_administration=raw_dosage,
+        summary=summary_text,
+        summarizer=summarizer_name
+    )
 
-print("\n--- FDA API DEBUG INFO ---")
-print(f"Base URL: {url}")
-print(f"Search Query Parameter (search): {search_query}")
+# =========================================================================
+# === CONCURRENT LOOKUP (multi-drug labels) ===
+# =========================================================================
 
+LOOKUP_CONCURRENCY = 4
+LOOKUP_TIMEOUT_SECONDS = 10
 
-response = requests.get(url, params=params)
-fda_data = response.json()
+async def fetch_label_async(http, drug_name, cache=None, index=None, offline=OFFLINE):
+    """
+    Queries openFDA for the drug label over the aiohttp session `http`.
+    A LabelIndex (local bulk dump) is checked first and a LabelCache skips
+    the round trip for drugs we've already looked up; with offline=True
+    the network is never used. Returns the first result dict or None.
+    """
+    if index is not None:
+        result = index.lookup(drug_name)
+        if result is not None:
+            return result
+
+    if offline:
+        return None
+
+    if cache is not None:
+        hit, cached = cache.get(drug_name)
+        if hit:
+            return cached
+
+    params = {"search": f'{drug_name}', "limit": 1}
+    if os.getenv("OPEN_FDA_KEY"):
+        params["api_key"] = os.getenv("OPEN_FDA_KEY")
+
+    # Wall time only is meaningful here: other lookups share this thread
+    with stage("fda_http"):
+        async with http.get(FDA_URL, params=params) as response:
+            status = response.status
+            try:
+                fda_data = await response.json(content_type=None)
+            except ValueError:
+                fda_data = None  # e.g. an HTML error page from a gateway
+
+    # Anything but a JSON object is a failed lookup, and is not cached
+    if not isinstance(fda_data, dict):
+        print(f"✗ FDA returned a non-JSON response (HTTP {status}) for {drug_name}")
+        return None
+
+    result = None
+    results = fda_data.get("results")
+    if isinstance(results, list) and results and isinstance(results[0], dict):
+        result = results[0]
+
+    if cache is not None and status in (200, 404):
+        cache.put(drug_name, result)
+
+    return result
+
+def open_session(concurrency=LOOKUP_CONCURRENCY, timeout=LOOKUP_TIMEOUT_SECONDS):
+    """Pooled aiohttp session (call from inside the event loop that will use it)"""
+    import aiohttp
+
+    return aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency),
+                                 timeout=aiohttp.ClientTimeout(total=timeout))
+
+async def lookup_many_async(drug_names, http=None, cache=None, index=None, summary_cache=None, summarizer=None,
+                            concurrency=LOOKUP_CONCURRENCY, timeout=LOOKUP_TIMEOUT_SECONDS):
+    """
+    Resolve several drugs at once. FDA requests share one pooled aiohttp
+    session (at most `concurrency` in flight), and summaries run in worker
+    threads, so five drugs cost about one. Pass a long-lived `http` session
+    to keep connections across calls; without one a session is opened just
+    for this call. Returns labels in the same order as `drug_names`
+    (None where not found).
+    """
+    import aiohttp
+
+    if http is None:
+        async with open_session(concurrency, timeout) as http:
+            return await lookup_many_async(drug_names, http=http, cache=cache, index=index,
+                                           summary_cache=summary_cache, summarizer=summarizer,
+                                           concurrency=concurrency, timeout=timeout)
+
+    limit = asyncio.Semaphore(concurrency)
+
+    async def resolve(drug_name):
+        async with limit:
+            try:
+                result = await fetch_label_async(http, drug_name, cache=cache, index=index)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                print(f"✗ FDA lookup failed for {drug_name}: {e!r}")
+                return None
+
+            if result is None:
+                print(f"No results found for {drug_name} using targeted search.")
+                return None
+
+            return await asyncio.to_thread(
+                build_label, drug_name, result,
+                summary_cache=summary_cache, summarizer=summarizer
+            )
 
-if "results" in fda_data:
-    result = fda_data["results"][0]
+    return await asyncio.gather(*(resolve(name) for name in drug_names))
 
-    # 1. Extract the raw data
-    found_brand = result.get("openfda", {}).get("brand_name", ["N/A"])[0]
-    
-    raw_purpose = result.get("purpose", ["N/A"])[0]
-    raw_indications = result.get("indications_and_usage", ["N/A"])[0]
-    raw_dosage = result.get("dosage_and_administration", ["N/A"])[0]
+def lookup_many(drug_names, **kwargs):
+    """Blocking one-shot wrapper around lookup_many_async (scripts; services use LookupClient)"""
+    if not drug_names:
+        return []
+    print(f"Searching for drugs: {', '.join(drug_names)}")
+    return asyncio.run(lookup_many_async(drug_names, **kwargs))
 
-    # 2. Call the LLM Summarization Function
-    summary_text = generate_summary(
-        drug_name=found_brand,
-        purpose=raw_purpose,
-        indications=raw_indications,
-        dosage=raw_dosage
-    )
+class LookupClient:
+    """
+    Blocking lookup_many for long-lived callers. One event loop runs on a
+    background thread for the life of the client and owns one pooled
+    aiohttp session, so consecutive scans reuse openFDA connections
+    instead of building a loop and a session each time.
+    """
 
-    # 3. Display the Summarized Output
+    def __init__(self, concurrency=LOOKUP_CONCURRENCY, timeout=LOOKUP_TIMEOUT_SECONDS):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.loop = None
+        self.thread = None
+        self.http = None
+
+    def start(self):
+        """Start the loop thread and open the session (idempotent)"""
+        with self.lock:
+            if self.loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            self.thread = threading.Thread(target=loop.run_forever, name="medid-lookup", daemon=True)
+            self.thread.start()
+            self.loop = loop
+            self.http = self.run(self.open())
+
+    async def open(self):
+        return open_session(self.concurrency, self.timeout)
+
+    def run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def lookup_many(self, drug_names, **kwargs):
+        """Same as the module-level lookup_many, over the shared session"""
+        if not drug_names:
+            return []
+        self.start()
+        print(f"Searching for drugs: {', '.join(drug_names)}")
+        return self.run(lookup_many_async(drug_names, http=self.http, concurrency=self.concurrency,
+                                          timeout=self.timeout, **kwargs))
+
+    def close(self):
+        with self.lock:
+            if self.loop is None:
+                return
+            self.run(self.http.close())
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+            self.loop.close()
+            self.loop = self.thread = self.http = None
+
+def print_summary(label):
+    """Display the Summarized Output"""
     print("\n\n======================================================= =")
-    print("🧠 GEMINI SUMMARIZATION FOR GENERAL AUDIENCE")
+    print(f"🧠 {label.summarizer.upper()} SUMMARIZATION FOR GENERAL AUDIENCE")
     print("========================================================")
-    print(summary_text)
+    print(label.summary)
     print("========================================================")
 
-else:
-    print(f"No results found for {drug_name} using targeted search.")
+# =========================================================================
+# === START SCRIPT EXECUTION ===
+# =========================================================================
 
-print("\nThank you for using MED_ID!")
\ No newline at end of file
+def main():
+    # Load the filtered text
+    with open(FILTER_OUTPUT_FILE, "r", encoding="utf-8") as f:
+        filtered_text = json.load(f)
+
+    # Extract the drug name from the list
+    data = [item["text"] for item in filtered_text]
+    if len(data) == 0:
+        print("No data passed, please try again")
+        sys.exit()
+
+    # Initialize the summarizer (Gemini or local) before any data processing
+    from summarizer import get_summarizer
+    summarizer = get_summarizer(summary_cache=SummaryCache())
+
+    # Resolve every drug name the classifier kept, concurrently
+    cache = LabelCache()
+    index = LabelIndex.open_if_exists()
+    labels = lookup_many(data, cache=cache, index=index, summarizer=summarizer)
+    for label in labels:
+        if label:
+            print_summary(label)
+
+    print("\nThank you for using MED_ID!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+import json
+import os
+import queue
+import threading
+import time
+
+from metrics import METRICS, stage
+from pipeline import collect_images
+from results import ScanResult
+
+BATCH_OUTPUT_DIR = "results/batch"
+QUEUE_SIZE = 4  # Items allowed to wait between two stages
+PUT_TIMEOUT_SECONDS = 0.5
+
+_DONE = object()  # End-of-stream marker passed down the stages
+
+class BatchItem:
+    """One image travelling through the stages"""
+
+    def __init__(self, key, image):
+        self.key = key
+        self.image = image
+        self.result = ScanResult()
+        self.result.ocr.source = key
+        self.error = None
+        self.pending_ocr = None  # AsyncResult while the image is in an OCRPool
+        self.started = time.perf_counter()
+
+    def to_record(self):
+        record = self.result.to_dict()
+        record["error"] = self.error
+        record["elapsed_ms"] = round((time.perf_counter() - self.started) * 1000, 1)
+        return record
+
+def _put(q, item, stop):
+    """Blocking put that still notices a stop request"""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=PUT_TIMEOUT_SECONDS)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _stage(name, work, inbox, outbox, stop):
+    """
+    Worker body: pull items, run `work` on the ones that are still alive,
+    pass everything on. A failure marks the item instead of killing the stage.
+    """
+    while not stop.is_set():
+        item = inbox.get()
+        if item is _DONE:
+            break
+        if item.error is None and item.image is not None:
+            try:
+                if not work(item):
+                    item.image = None  # Nothing for later stages to do
+            except Exception as e:
+                print(f"✗ {name} failed for {item.key}: {e}")
+                item.error = f"{name}: {e}"
+        if not _put(outbox, item, stop):
+            return
+    _put(outbox, _DONE, stop)
+
+def _decode(sources, outbox, stop):
+    """Source stage: walk the images lazily and decode them one at a time"""
+    import cv2
+
+    for key, image in collect_images(sources):
+        if stop.is_set():
+            return
+        item = BatchItem(key, None)
+        if isinstance(image, str):
+            with stage("decode"):
+                image = cv2.imread(image)
+            if image is None:
+                item.error = f"decode: could not read {key}"
+        item.image = image
+        if not _put(outbox, item, stop):
+            return
+    _put(outbox, _DONE, stop)
+
+def _collect_ocr(item):
+    """Wait for an image handed to the OCRPool and record the worker's timing"""
+    key, ocr, error, (wall, cpu, process_cpu) = item.pending_ocr.get()
+    item.pending_ocr = None
+    if error:
+        raise RuntimeError(error)
+    METRICS.record("ocr", wall, cpu, process_cpu=process_cpu)
+    item.result.ocr = ocr
+    return bool(ocr)
+
+def scan_images(pipe, sources, queue_size=QUEUE_SIZE, ocr_pool=None):
+    """
+    Generator pipeline over a directory (or list of paths): decode -> [detect] ->
+    OCR -> NER -> lookup, each stage on its own thread with bounded queues in
+    between, so at most a few images are in memory at once. Yields BatchItems
+    in input order as they come out of the last stage.
+    With an OCRPool, the OCR stage only submits images to the pool and an
+    "ocr_collect" stage waits for them in order, so up to queue_size images
+    are OCR'd in parallel.
+    """
+    stages = []
+    if pipe.detector:
+        def detect(item):
+            item.image = pipe.detect_stage(item.image, item.result)
+            return item.image is not None
+        stages.append(("detect", detect))
+
+    if ocr_pool is None:
+        stages.append(("ocr", lambda item: pipe.ocr_stage(item.image, item.result, item.key)))
+    else:
+        def submit(item):
+            item.pending_ocr = ocr_pool.submit(item.key, item.image)
+            return True
+        stages += [("ocr", submit), ("ocr_collect", _collect_ocr)]
+        # Enough room between submit and collect to keep every worker busy
+        queue_size = max(queue_size, ocr_pool.workers)
+
+    stages += [
+        ("ner", lambda item: pipe.ner_stage(item.result)),
+        ("lookup", lambda item: pipe.lookup_stage(item.result)),
+    ]
+
+    stop = threading.Event()
+    queues = [queue.Queue(maxsize=queue_size) for _ in range(len(stages) + 1)]
+    # Named threads so py-spy / faulthandler dumps show which stage is busy
+    threads = [threading.Thread(target=_decode, args=(sources, queues[0], stop),
+                                name="medid-decode", daemon=True)]
+    for i, (name, work) in enumerate(stages):
+        threads.append(threading.Thread(target=_stage, args=(name, work, queues[i], queues[i + 1], stop),
+                                        name=f"medid-{name}", daemon=True))
+
+    for thread in threads:
+        thread.start()
+
+    try:
+        while True:
+            item = queues[-1].get()
+            if item is _DONE:
+                break
+            item.image = None  # Drop the pixels before handing the result out
+            yield item
+    finally:
+        stop.set()
+        # Unblock any stage still waiting on its inbox
+        for q in queues:
+            try:
+                q.put_nowait(_DONE)
+            except queue.Full:
+                pass
+
+def run_batch(pipe, sources, output=None, queue_size=QUEUE_SIZE, ocr_pool=None):
+    """Stream every scan of `sources` to a JSONL file, one line per image"""
+    if output is None:
+        output = os.path.join(BATCH_OUTPUT_DIR, f"batch_{int(time.time())}.jsonl")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+
+    started = time.perf_counter()
+    counts = {"images": 0, "identified": 0, "errors": 0}
+
+    with open(output, "w", encoding="utf-8") as f:
+        for item in scan_images(pipe, sources, queue_size, ocr_pool):
+            f.write(json.dumps(item.to_record(), ensure_ascii=False) + "\n")
+            f.flush()
+
+            counts["images"] += 1
+            if item.error:
+                counts["errors"] += 1
+            elif item.result.label:
+                counts["identified"] += 1
+                print(f"✅ {item.key}: {item.result.label.brand_name}")
+            else:
+                print(f"✗ {item.key}: no medicine identified")
+
+    elapsed = time.perf_counter() - started
+    print(f"\n📊 {counts['images']} images, {counts['identified']} identified, "
+          f"{counts['errors']} errors in {elapsed:.1f}s")
+    print(f"💾 Results saved to: {output}")
+
+    METRICS.report()
+    print(f"💾 Metrics saved to: {METRICS.to_json(os.path.splitext(output)[0] + '.metrics.json')}")
+    return counts
@@ -0,0 +1,115 @@
+import os
+import re
+
+from fuzzy import NameMatcher
+from label_index import INDEX_FILE
+from vocabulary import ALL_DRUGS
+
+VOCABULARY_FILE = "data/drug_vocabulary.txt"  # Optional, one canonical name per line
+MAX_EDIT_DISTANCE = 2
+MAX_CANDIDATES = 5
+MIN_WORD_LENGTH = 4  # Shorter tokens are too ambiguous to correct
+
+WORD_SPLIT_RE = re.compile(r"[\s\-()/]+")
+
+class DrugNameCorrector:
+    """
+    Snaps OCR-garbled drug names ("Paratecamol") to canonical names from a
+    local vocabulary, using the shared rapidfuzz-backed NameMatcher.
+    """
+
+    def __init__(self, vocabulary=None, max_distance=MAX_EDIT_DISTANCE):
+        self.max_distance = max_distance
+        self.canonical = {}   # lowercase -> display name
+        self.matcher = NameMatcher(max_distance=max_distance)
+        for name in vocabulary if vocabulary is not None else load_vocabulary():
+            self.add(name)
+
+    def add(self, name):
+        key = name.strip().lower()
+        if not key or key in self.canonical:
+            return
+        self.canonical[key] = name.strip()
+        self.matcher.add(key)
+
+    def __len__(self):
+        return len(self.canonical)
+
+    def tolerance(self, word):
+        # One typo allowed in short names, max_distance in longer ones
+        return 1 if len(word) <= 5 else self.max_distance
+
+    def candidates(self, word, limit=MAX_CANDIDATES):
+        """Ranked [(canonical_name, distance), ...] within tolerance of `word`"""
+        key = word.strip().lower()
+        if key in self.canonical:
+            return [(self.canonical[key], 0)]
+
+        found = self.matcher.search(key, self.tolerance(key), limit)
+        return [(self.canonical[name], d) for d, name in found]
+
+    def correct(self, drug_name):
+        """
+        Returns (corrected_name, ranked_candidates). The whole name is tried
+        first, then each long-enough word in it that isn't the whole name
+        again; unknown names come back as-is.
+        """
+        ranked = self.candidates(drug_name)
+        if ranked:
+            return ranked[0][0], ranked
+
+        whole = drug_name.strip()
+        words = [w for w in WORD_SPLIT_RE.split(whole) if len(w) >= MIN_WORD_LENGTH and w != whole]
+        for word in words:
+            ranked = self.candidates(word)
+            if ranked:
+                return ranked[0][0], ranked
+
+        return drug_name, []
+
+    def correct_candidates(self, candidates):
+        """
+        Correct NER Candidates in place and drop any that collapse onto a name
+        an earlier (better scored) candidate already has.
+        """
+        kept = []
+        seen = set()
+        for candidate in candidates:
+            corrected, ranked = self.correct(candidate.drug_name)
+            candidate.matches = [[name, d] for name, d in ranked]
+            if corrected != candidate.drug_name:
+                print(f"🔤 Corrected '{candidate.drug_name}' -> '{corrected}'")
+                candidate.corrected_from = candidate.drug_name
+                candidate.drug_name = corrected
+
+            key = candidate.drug_name.lower()
+            if key not in seen:
+                seen.add(key)
+                kept.append(candidate)
+        return kept
+
+def load_vocabulary(vocabulary_file=VOCABULARY_FILE, index_file=INDEX_FILE):
+    """
+    Canonical names from, in order: the optional vocabulary file, the
+    built-in list and the local openFDA label index (if it has been
+    ingested). Earlier sources win when spellings differ only in case.
+    """
+    names = []
+
+    if os.path.exists(vocabulary_file):
+        with open(vocabulary_file, "r", encoding="utf-8") as f:
+            names.extend(line.strip() for line in f if line.strip())
+
+    names.extend(ALL_DRUGS)
+
+    if os.path.exists(index_file):
+        import sqlite3
+        conn = sqlite3.connect(f"file:{index_file}?mode=ro", uri=True)
+        try:
+            names.extend(row[0] for row in conn.execute("SELECT DISTINCT name FROM names"))
+        except sqlite3.Error as e:
+            print(f"SQLite Error: {e}")
+        finally:
+            conn.close()
+
+    return names
@@ -0,0 +1,136 @@
+import os
+
+import numpy as np
+
+DETECTOR_WEIGHTS = "ai/runs/detect/train5/weights/best.pt"
+DETECTOR_IMGSZ = 320
+
+# Inference backend, produced by setup/export_detector.py (torch needs no export).
+# Ultralytics runs .onnx through ONNX Runtime and *_openvino_model/ through OpenVINO.
+DETECTOR_BACKEND = os.getenv("MEDID_DETECTOR_BACKEND", "torch")
+BACKEND_WEIGHTS = {
+    "torch": DETECTOR_WEIGHTS,
+    "onnx": "ai/runs/detect/train5/weights/best.onnx",
+    "onnx-int8": "ai/runs/detect/train5/weights/best.int8.onnx",
+    "openvino": "ai/runs/detect/train5/weights/best_openvino_model",
+    "openvino-int8": "ai/runs/detect/train5/weights/best_int8_openvino_model",
+}
+
+# Also used by the camera tool in test/obj_detection.py
+CONF_THRESHOLD = 0.75  # For video stream
+CONF_THRESHOLD_IMAGE = 0.60  # Lower threshold for static images
+MIN_DETECTION_AREA = 5000  # For video stream
+MIN_DETECTION_AREA_IMAGE = 2000  # Lower threshold for static images
+STABILITY_FRAMES = 5  # Number of consecutive frames needed for stable detection
+CROP_PADDING = 20
+
+def iou_matrix(boxes_a, boxes_b):
+    """IoU between every box in boxes_a (N, 4) and boxes_b (M, 4) as an (N, M) array"""
+    a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+
+    x_left = np.maximum(a[:, None, 0], b[None, :, 0])
+    y_top = np.maximum(a[:, None, 1], b[None, :, 1])
+    x_right = np.minimum(a[:, None, 2], b[None, :, 2])
+    y_bottom = np.minimum(a[:, None, 3], b[None, :, 3])
+    intersection = np.clip(x_right - x_left, 0, None) * np.clip(y_bottom - y_top, 0, None)
+
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - intersection
+
+    return np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+def apply_nms(boxes, iou_threshold=0.5):
+    """Greedy NMS over (x1, y1, x2, y2, cls, conf) tuples, highest confidence first"""
+    if len(boxes) == 0:
+        return []
+
+    data = np.asarray(boxes, dtype=np.float32)
+    order = np.argsort(-data[:, 5], kind="stable")
+    ious = iou_matrix(data[order, :4], data[order, :4])
+
+    keep = []
+    suppressed = np.zeros(len(order), dtype=bool)
+    for i in range(len(order)):
+        if suppressed[i]:
+            continue
+        keep.append(boxes[order[i]])
+        suppressed |= ious[i] >= iou_threshold
+    return keep
+
+def is_stable_detection(current_box, history, iou_threshold=0.6):
+    """
+    Live-stream check: True once `history` holds STABILITY_FRAMES boxes of
+    one class that all overlap current_box by at least iou_threshold.
+    """
+    if len(history) < STABILITY_FRAMES:
+        return False
+    if len({h[4] for h in history}) > 1:
+        return False
+    ious = iou_matrix(current_box[:4], [h[:4] for h in history])[0]
+    return bool((ious >= iou_threshold).all())
+
+def crop(frame, bigbox, padding=CROP_PADDING):
+    """Padded bottle crop, kept in memory (no JPEG round trip) and contiguous for OCR"""
+    x1, y1, x2, y2 = bigbox[:4]
+    h, w = frame.shape[:2]
+    region = frame[max(0, y1 - padding):min(h, y2 + padding), max(0, x1 - padding):min(w, x2 + padding)]
+    return np.ascontiguousarray(region)
+
+def resolve_weights(backend=None, weights=None):
+    """Weights path for a backend; MEDID_DETECTOR_WEIGHTS overrides the default layout"""
+    backend = backend or DETECTOR_BACKEND
+    if backend not in BACKEND_WEIGHTS:
+        raise ValueError(f"Unknown detector backend '{backend}', expected one of {list(BACKEND_WEIGHTS)}")
+    return weights or os.getenv("MEDID_DETECTOR_WEIGHTS") or BACKEND_WEIGHTS[backend]
+
+def load_yolo(backend=None, weights=None):
+    """YOLO model on the configured backend; falls back to PyTorch if the export is missing"""
+    from ultralytics import YOLO
+
+    backend = backend or DETECTOR_BACKEND
+    path = resolve_weights(backend, weights)
+    if not os.path.exists(path):
+        print(f"❌ {backend} weights not found at {path}, run setup/export_detector.py. Using PyTorch.")
+        backend, path = "torch", DETECTOR_WEIGHTS
+
+    print(f"✅ Detector loaded: {backend} ({path})")
+    return YOLO(path, task="detect")
+
+class BottleDetector:
+    """
+    YOLO bottle detector for the scan pipeline. locate() returns the largest
+    box in a still image that passes the confidence/area filters.
+    """
+
+    def __init__(self, backend=None, weights=None, imgsz=DETECTOR_IMGSZ):
+        self.model = load_yolo(backend, weights)
+        self.imgsz = imgsz
+
+    def detect(self, frame, use_image_thresholds=False):
+        """All filtered detections after NMS, as (x1, y1, x2, y2, cls, conf) tuples"""
+        conf_thresh = CONF_THRESHOLD_IMAGE if use_image_thresholds else CONF_THRESHOLD
+        area_thresh = MIN_DETECTION_AREA_IMAGE if use_image_thresholds else MIN_DETECTION_AREA
+
+        results = self.model(frame, imgsz=self.imgsz, conf=0.5, iou=0.4, verbose=False)
+
+        detections = []
+        for r in results:
+            for box in r.boxes:
+                conf = float(box.conf[0])
+                x1, y1, x2, y2 = map(int, box.xyxy[0])
+                if conf > conf_thresh and (x2 - x1) * (y2 - y1) > area_thresh:
+                    detections.append((x1, y1, x2, y2, int(box.cls[0]), conf))
+
+        return apply_nms(detections)
+
+    def locate(self, frame, use_image_thresholds=True):
+        """Largest detection in a still image, or None"""
+        detections = self.detect(frame, use_image_thresholds)
+        if not detections:
+            return None
+        return max(detections, key=lambda d: (d[2] - d[0]) * (d[3] - d[1]))
+
+    def class_name(self, cls):
+        return self.model.names[cls]
@@ -0,0 +1,105 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_FILE = "results/cache/fda_labels.sqlite"
+CACHE_TTL_SECONDS = 7 * 24 * 3600   # Labels change rarely; re-fetch weekly
+CACHE_MAX_ENTRIES = 5000
+
+def normalize_query(query):
+    """Cache key: case- and whitespace-insensitive search string"""
+    return " ".join(str(query).lower().split())
+
+class LabelCache:
+    """
+    Persistent openFDA response cache backed by SQLite.
+    Entries expire after `ttl` seconds and the least recently used ones are
+    evicted once the table grows past `max_entries`. "Not found" answers are
+    cached too (as None) so repeated misses don't hit the network either.
+    """
+
+    def __init__(self, path=CACHE_FILE, ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # One connection shared by the server's worker threads, guarded by self.lock
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS labels ("
+            "key TEXT PRIMARY KEY, payload TEXT, created REAL, accessed REAL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS labels_accessed ON labels(accessed)")
+        self.conn.commit()
+
+    def get(self, query):
+        """Returns (hit, value). value is the cached label dict or None for a cached miss."""
+        key = normalize_query(query)
+        now = time.time()
+
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT payload, created FROM labels WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    self.conn.execute("DELETE FROM labels WHERE key = ?", (key,))
+                    self.conn.commit()
+                self.misses += 1
+                return False, None
+
+            self.conn.execute("UPDATE labels SET accessed = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            self.hits += 1
+            return True, json.loads(row[0])
+
+    def put(self, query, value):
+        key = normalize_query(query)
+        now = time.time()
+
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO labels (key, payload, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now, now)
+            )
+            self.evict()
+            self.conn.commit()
+
+    def evict(self):
+        """Drop the least recently used rows beyond max_entries (caller holds the lock)"""
+        count = self.conn.execute("SELECT COUNT(*) FROM labels").fetchone()[0]
+        if count > self.max_entries:
+            self.conn.execute(
+                "DELETE FROM labels WHERE key IN "
+                "(SELECT key FROM labels ORDER BY accessed ASC LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM labels")
+            self.conn.commit()
+
+    def stats(self):
+        with self.lock:
+            size = self.conn.execute("SELECT COUNT(*) FROM labels").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": size
+        }
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
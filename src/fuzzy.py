@@ -0,0 +1,78 @@
+import numpy as np
+from rapidfuzz import process
+from rapidfuzz.distance import Levenshtein
+
+MAX_EDIT_DISTANCE = 2
+MAX_BLOCK_CELLS = 4_000_000  # Distance-matrix cells per cdist call (~4 MB as int8)
+
+class NameMatcher:
+    """
+    Edit-distance search over a vocabulary of names, shared by the drug-name
+    corrector and the rule classifier. Comparisons run in rapidfuzz's C++
+    Levenshtein, which stops as soon as a pair is past the cutoff. Names are
+    bucketed by length, so a query only meets names that could be within
+    max_distance; each bucket is kept sorted, so ties resolve alphabetically.
+    """
+
+    def __init__(self, names=(), max_distance=MAX_EDIT_DISTANCE):
+        self.max_distance = max_distance
+        self.by_length = {}  # length -> set of names
+        self.pools = {}      # query length -> sorted names within max_distance of it
+        for name in names:
+            self.add(name)
+
+    def add(self, name):
+        bucket = self.by_length.setdefault(len(name), set())
+        if name not in bucket:
+            bucket.add(name)
+            self.pools.clear()
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self.by_length.values())
+
+    def pool(self, length):
+        pool = self.pools.get(length)
+        if pool is None:
+            pool = sorted(name for size in range(length - self.max_distance, length + self.max_distance + 1)
+                          for name in self.by_length.get(size, ()))
+            self.pools[length] = pool
+        return pool
+
+    def search(self, word, max_distance=None, limit=None):
+        """All (distance, name) pairs within max_distance of `word`, closest first"""
+        cutoff = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        hits = process.extract(word, self.pool(len(word)), scorer=Levenshtein.distance,
+                               score_cutoff=cutoff, limit=None)
+        found = sorted((d, name) for name, d, _ in hits)
+        return found[:limit] if limit else found
+
+    def closest_many(self, words, skip_exact=False):
+        """
+        {word: (distance, name)} for the closest name of every word that has
+        one within max_distance, computed bucket by bucket with one
+        multi-threaded cdist matrix per block of queries.
+        skip_exact ignores distance-0 hits (the word itself).
+        """
+        over = self.max_distance + 1
+        by_length = {}
+        for word in dict.fromkeys(words):
+            by_length.setdefault(len(word), []).append(word)
+
+        best = {}
+        for length, group in by_length.items():
+            pool = self.pool(length)
+            if not pool:
+                continue
+            block = max(1, MAX_BLOCK_CELLS // len(pool))
+            for start in range(0, len(group), block):
+                queries = group[start:start + block]
+                dist = process.cdist(queries, pool, scorer=Levenshtein.distance, score_cutoff=self.max_distance,
+                                     dtype=np.int8, workers=-1)
+                if skip_exact:
+                    dist[dist == 0] = over
+                cols = dist.argmin(axis=1)  # First (alphabetical) of the closest names
+                for row, col in enumerate(cols):
+                    d = int(dist[row, col])
+                    if d < over:
+                        best[queries[row]] = (d, pool[col])
+        return best
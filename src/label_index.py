@@ -0,0 +1,207 @@
+import argparse
+import json
+import os
+import sqlite3
+import time
+import zipfile
+
+INDEX_FILE = "data/openfda_labels.sqlite"
+INGEST_BATCH_SIZE = 1000  # Labels per transaction while ingesting
+
+# openfda name fields we index, best match first
+NAME_FIELDS = ("brand_name", "generic_name", "substance_name")
+
+def normalize_name(name):
+    return " ".join(str(name).lower().split())
+
+def first(value):
+    """openFDA stores every field as a list of strings"""
+    if isinstance(value, list):
+        return value[0] if value else None
+    return value
+
+class LabelIndex:
+    """
+    Offline copy of the openFDA drug-label bulk dump in SQLite.
+    Labels are indexed by brand, generic and substance name so a lookup is a
+    single B-tree probe instead of a network round trip.
+    """
+
+    def __init__(self, path=INDEX_FILE):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS labels (
+                id INTEGER PRIMARY KEY,
+                set_id TEXT UNIQUE,
+                brand_name TEXT,
+                purpose TEXT,
+                indications_and_usage TEXT,
+                dosage_and_administration TEXT
+            );
+            CREATE TABLE IF NOT EXISTS names (
+                name TEXT NOT NULL,
+                rank INTEGER NOT NULL,
+                label_id INTEGER NOT NULL REFERENCES labels(id)
+            );
+            CREATE INDEX IF NOT EXISTS names_name ON names(name, rank);
+        """)
+
+    @classmethod
+    def open_if_exists(cls, path=INDEX_FILE):
+        """Return a LabelIndex when the ingest step has been run, else None"""
+        if not os.path.exists(path):
+            return None
+        return cls(path)
+
+    def iter_dump(self, filepath):
+        """
+        Yield label records from a bulk dump (.json or the .json.zip openFDA ships).
+        `results` is parsed incrementally, so memory stays flat however large
+        the dump is.
+        """
+        import ijson
+
+        if filepath.endswith(".zip"):
+            with zipfile.ZipFile(filepath) as archive:
+                for member in archive.namelist():
+                    if member.endswith(".json"):
+                        with archive.open(member) as f:
+                            yield from ijson.items(f, "results.item", use_float=True)
+        else:
+            with open(filepath, "rb") as f:
+                yield from ijson.items(f, "results.item", use_float=True)
+
+    def add_label(self, cursor, record):
+        """Insert one label and its names, replacing any earlier copy of it"""
+        openfda = record.get("openfda", {})
+        set_id = record.get("set_id") or record.get("id")
+
+        old = cursor.execute("SELECT id FROM labels WHERE set_id = ?", (set_id,)).fetchone()
+        if old:
+            cursor.execute("DELETE FROM names WHERE label_id = ?", (old[0],))
+            cursor.execute("DELETE FROM labels WHERE id = ?", (old[0],))
+
+        cursor.execute(
+            "INSERT INTO labels (set_id, brand_name, purpose, indications_and_usage, "
+            "dosage_and_administration) VALUES (?, ?, ?, ?, ?)",
+            (
+                set_id,
+                first(openfda.get("brand_name")),
+                first(record.get("purpose")),
+                first(record.get("indications_and_usage")),
+                first(record.get("dosage_and_administration"))
+            )
+        )
+        label_id = cursor.lastrowid
+
+        names = set()
+        for rank, field in enumerate(NAME_FIELDS):
+            for name in openfda.get(field, []):
+                key = normalize_name(name)
+                if key and key not in names:
+                    names.add(key)
+                    cursor.execute(
+                        "INSERT INTO names (name, rank, label_id) VALUES (?, ?, ?)",
+                        (key, rank, label_id)
+                    )
+
+    def ingest(self, filepath, batch_size=INGEST_BATCH_SIZE):
+        """
+        Load one bulk dump file into the index. Re-ingesting a label replaces it.
+        Commits every `batch_size` labels, so the journal stays small and an
+        interrupted ingest keeps what it had already loaded.
+        """
+        start = time.time()
+        count = 0
+        cursor = self.conn.cursor()
+
+        try:
+            for record in self.iter_dump(filepath):
+                self.add_label(cursor, record)
+                count += 1
+                if count % batch_size == 0:
+                    self.conn.commit()
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+
+        print(f"✅ Indexed {count} labels from {filepath} in {time.time() - start:.1f}s")
+        return count
+
+    def lookup(self, drug_name):
+        """
+        Resolve a drug name to a label shaped like an openFDA API result, or None.
+        Exact name matches win; otherwise fall back to a prefix match on the index.
+        Labels that actually carry purpose/indications/dosage text are preferred.
+        """
+        key = normalize_name(drug_name)
+        if not key:
+            return None
+
+        order = (
+            " ORDER BY (l.indications_and_usage IS NOT NULL) + (l.dosage_and_administration IS NOT NULL)"
+            " + (l.purpose IS NOT NULL) DESC, n.rank ASC LIMIT 1"
+        )
+        select = (
+            "SELECT l.brand_name, l.purpose, l.indications_and_usage, l.dosage_and_administration"
+            " FROM names n JOIN labels l ON l.id = n.label_id"
+        )
+
+        row = self.conn.execute(select + " WHERE n.name = ?" + order, (key,)).fetchone()
+        if row is None:
+            # Range scan keeps the prefix match on the index
+            row = self.conn.execute(
+                select + " WHERE n.name >= ? AND n.name < ?" + order, (key, key + "\uffff")
+            ).fetchone()
+        if row is None:
+            return None
+
+        brand, purpose, indications, dosage = row
+        result = {"openfda": {}}
+        if brand:
+            result["openfda"]["brand_name"] = [brand]
+        for field, value in (("purpose", purpose),
+                             ("indications_and_usage", indications),
+                             ("dosage_and_administration", dosage)):
+            if value:
+                result[field] = [value]
+        return result
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM labels").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline openFDA drug-label index")
+    parser.add_argument("--index", default=INDEX_FILE, help="SQLite index file")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ingest = sub.add_parser("ingest", help="Load openFDA drug-label bulk dump files")
+    ingest.add_argument("files", nargs="+", help="drug-label-*.json or .json.zip files")
+
+    find = sub.add_parser("lookup", help="Look up one drug name")
+    find.add_argument("name")
+
+    args = parser.parse_args()
+    index = LabelIndex(args.index)
+
+    if args.command == "ingest":
+        for filepath in args.files:
+            if not os.path.exists(filepath):
+                print(f"❌ File not found: {filepath}")
+                continue
+            index.ingest(filepath)
+        print(f"📚 Index now holds {index.count()} labels: {args.index}")
+    else:
+        print(json.dumps(index.lookup(args.name), ensure_ascii=False, indent=4))
+
+    index.close()
+
+if __name__ == "__main__":
+    main()
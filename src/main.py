@@ -1,45 +1,120 @@
+import argparse
 import sys
 import os
 
-def run_pipeline():
-    print("=== STEP 1: OCR TEXT EXTRACTION ===")
+from metrics import METRICS
+from service import DETECT, MedIdPipeline
+import api_client
+
+def load_pipeline(detect=DETECT, ocr=True):
+    print("=== STEP 0: LOADING MODELS ===")
     try:
-        from pipeline import process_pipe
-        process_pipe()
-        print("✓ OCR processing completed successfully\n")
+        pipe = MedIdPipeline(detect=detect)
+        # Models load on background threads while the user reads the disclaimer
+        pipe.preload(ocr=ocr)
+        return pipe
     except Exception as e:
-        print(f"✗ Error in OCR pipeline: {e}")
+        print(f"✗ Error loading models: {e}")
         sys.exit(1)
 
-def run_prediction():
-    print("=== STEP 2: MEDICINE TEXT CLASSIFICATION ===")
+def wait_for_models(pipe, ocr=True):
     try:
-        import predict
-        print("✓ Text classifcation completed successfully\n")
+        pipe.wait_ready(ocr=ocr)
     except Exception as e:
-        print(f"✗ Error in prediction step: {e}")
+        print(f"✗ Error loading models: {e}")
         sys.exit(1)
+    print("✓ OCR, NER and API clients ready")
+    pipe.startup_report()
+    print()
 
-def run_api_client():
-    print("=== STEP 3: FDA API LOOKUP ===")
+def run_scan(pipe, image):
+    print("=== STEP 1-3: OCR → CLASSIFICATION → FDA LOOKUP ===")
     try:
-        import api_client
-        
-        print("✓ FDA API lookup completed successfully\n")
+        result = pipe.identify(image)
     except Exception as e:
-        print(f"✗ Error in API client: {e}")
+        print(f"✗ Error in pipeline: {e}")
+        return None
+
+    if not result.ocr:
+        print("✗ No text could be extracted from the image\n")
+    elif result.candidate is None:
+        print("✗ No valid medicine detected\n")
+    elif result.label is None:
+        print("✗ No FDA label found\n")
+    else:
+        for label in result.labels:
+            api_client.print_summary(label)
+        print("✓ FDA API lookup completed successfully\n")
+    return result
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Med-ID: identify medicines from label photos")
+    parser.add_argument("--batch", metavar="DIR", help="Scan every image in DIR non-interactively")
+    parser.add_argument("--out", metavar="FILE", help="JSONL output for --batch (default: results/batch/)")
+    parser.add_argument("--queue-size", type=int, default=4, help="Images in flight between batch stages")
+    parser.add_argument("--ocr-workers", type=int, default=0,
+                        help="Run --batch OCR in N PaddleOCR processes (0: one in-process PaddleOCR)")
+    parser.add_argument("--ocr-threads", type=int, default=1, help="CPU threads per --ocr-workers process")
+    parser.add_argument("--detect", action="store_true", default=DETECT,
+                        help="Crop to the YOLO bottle detection before OCR")
+    return parser.parse_args()
+
+def batch_mode(args):
+    from batch import run_batch
+
+    if not os.path.isdir(args.batch):
+        print(f"❌ Directory not found: {args.batch}")
         sys.exit(1)
 
+    pool = None
+    if args.ocr_workers > 0:
+        from ocr_pool import OCRPool
+        pool = OCRPool(workers=args.ocr_workers, threads_per_worker=args.ocr_threads).start()
+
+    pipe = load_pipeline(args.detect, ocr=pool is None)
+    wait_for_models(pipe, ocr=pool is None)
+    try:
+        run_batch(pipe, args.batch, args.out, args.queue_size, ocr_pool=pool)
+    finally:
+        if pool:
+            pool.close()
+        pipe.close()
+        for path in METRICS.dump_profiles():
+            print(f"💾 Profile saved to: {path}")
+
 def main():
+    args = parse_args()
 
     print("🔬 MEDICINE IDENTIFICATION SYSTEM")
     print("=" * 50)
-    run_pipeline() 
-    run_prediction()    
-    run_api_client()
-    
+    if args.batch:
+        batch_mode(args)
+        return
+
+    pipe = load_pipeline(args.detect)
+    pipe.app.precaution()
+
+    ready = False
+    while True:
+        image = pipe.app.mode()
+        if image is None:
+            print("\n❌ No image provided.")
+        else:
+            if not ready:
+                wait_for_models(pipe)
+                ready = True
+            run_scan(pipe, image)
+
+        again = input("Scan another medicine? (Y/N): ").strip().lower()
+        if again != "y":
+            break
+
+    pipe.close()
+    METRICS.report()
+    for path in METRICS.dump_profiles():
+        print(f"💾 Profile saved to: {path}")
     print("=" * 50)
     print("Medicine identification process completed!")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,281 @@
+import cProfile
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+try:
+    import resource  # Not available on Windows
+except ImportError:
+    resource = None
+
+try:
+    import psutil  # Optional: current RSS where /proc isn't available
+except ImportError:
+    psutil = None
+
+QUANTILES = (0.5, 0.95, 0.99)
+MAX_SAMPLES = 2048  # Per-stage reservoir; percentiles cover the most recent samples
+METRICS_PREFIX = "medid"
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+# Set MEDID_PROFILE=<dir> to cProfile every top-level stage into <dir>/<stage>.prof
+PROFILE_DIR = os.getenv("MEDID_PROFILE")
+
+def peak_rss_bytes():
+    """
+    Process high-water resident memory (ru_maxrss is KiB on Linux, bytes on
+    macOS). It never goes down, so it can't be attributed to a stage.
+    """
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+def current_rss_bytes():
+    """Resident memory right now: /proc/self/statm on Linux, else psutil, else 0"""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        pass
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    return 0
+
+class Histogram:
+    """Count, sum and a bounded window of samples for percentile estimates"""
+
+    def __init__(self, max_samples=MAX_SAMPLES):
+        self.samples = deque(maxlen=max_samples)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def to_dict(self):
+        data = {"count": self.count, "sum": round(self.total, 6)}
+        for q in QUANTILES:
+            data[f"p{int(q * 100)}"] = round(self.quantile(q), 6)
+        return data
+
+class StageStats:
+    def __init__(self):
+        self.wall = Histogram()
+        self.cpu = Histogram()
+        self.process_cpu = Histogram()
+        self.errors = 0
+        self.rss_delta = Histogram()  # Current RSS at exit minus at entry, per call
+        self.max_rss = 0              # Largest current RSS seen at entry or exit
+
+class Metrics:
+    """
+    Thread-safe registry of per-stage wall time, CPU time and memory.
+    Wrap a stage with `with stage("ocr"):`. Two CPU figures are kept:
+    `cpu` is the calling thread's only (thread_time), so concurrent stages
+    don't count each other's work, but it misses the worker threads that
+    PaddleOCR, spaCy and ONNX Runtime spin up; `process_cpu` is the whole
+    process (process_time) and includes those, plus anything else running
+    at the same time. Memory is the process's current RSS sampled at stage
+    entry and exit, so the per-call delta also includes allocations made by
+    concurrent stages.
+    """
+
+    def __init__(self, profile_dir=PROFILE_DIR):
+        self.lock = threading.Lock()
+        self.stages = {}
+        self.started = time.time()
+        self.profile_dir = profile_dir
+        self.profiles = {}
+        self.local = threading.local()
+
+    @contextmanager
+    def stage(self, name):
+        profiler = self.start_profile()
+        rss_before = current_rss_bytes()
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        process_cpu_start = time.process_time()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.thread_time() - cpu_start
+            process_cpu = time.process_time() - process_cpu_start
+            rss_after = current_rss_bytes()
+            self.stop_profile(profiler, name)
+            self.record(name, wall, cpu, (rss_before, rss_after), failed, process_cpu)
+
+    def record(self, name, wall, cpu, rss=None, failed=False, process_cpu=None):
+        """rss is (bytes at entry, bytes at exit), or None when not sampled (e.g. another process)"""
+        with self.lock:
+            stats = self.stages.setdefault(name, StageStats())
+            stats.wall.observe(wall)
+            stats.cpu.observe(cpu)
+            stats.process_cpu.observe(cpu if process_cpu is None else process_cpu)
+            if rss is not None:
+                rss_before, rss_after = rss
+                stats.rss_delta.observe(rss_after - rss_before)
+                stats.max_rss = max(stats.max_rss, rss_before, rss_after)
+            if failed:
+                stats.errors += 1
+
+    # === PROFILING HOOK ===
+    def start_profile(self):
+        # Only the outermost stage on a thread is profiled (profilers can't nest)
+        if not self.profile_dir or getattr(self.local, "profiling", False):
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            return None  # Another profiler (e.g. in another thread on 3.12+) is active
+        self.local.profiling = True
+        return profiler
+
+    def stop_profile(self, profiler, name):
+        if profiler is None:
+            return
+        profiler.disable()
+        self.local.profiling = False
+        with self.lock:
+            if name in self.profiles:
+                self.profiles[name].add(profiler)
+            else:
+                import pstats
+                self.profiles[name] = pstats.Stats(profiler)
+
+    def dump_profiles(self):
+        """Write <profile_dir>/<stage>.prof (open with snakeviz or pstats)"""
+        if not self.profile_dir or not self.profiles:
+            return []
+        os.makedirs(self.profile_dir, exist_ok=True)
+        paths = []
+        with self.lock:
+            for name, stats in self.profiles.items():
+                path = os.path.join(self.profile_dir, f"{name}.prof")
+                stats.dump_stats(path)
+                paths.append(path)
+        return paths
+
+    # === EXPORT ===
+    def to_dict(self):
+        with self.lock:
+            return {
+                "uptime_seconds": round(time.time() - self.started, 1),
+                "peak_rss_bytes": peak_rss_bytes(),
+                "rss_bytes": current_rss_bytes(),
+                "stages": {
+                    name: {
+                        "wall_seconds": stats.wall.to_dict(),
+                        "cpu_seconds": stats.cpu.to_dict(),
+                        "process_cpu_seconds": stats.process_cpu.to_dict(),
+                        "errors": stats.errors,
+                        "rss_delta_bytes": stats.rss_delta.to_dict(),
+                        "max_rss_bytes": stats.max_rss,
+                    }
+                    for name, stats in self.stages.items()
+                }
+            }
+
+    def to_json(self, filepath):
+        os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+        with open(filepath, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=4)
+        return filepath
+
+    def to_prometheus(self):
+        """Prometheus text exposition format (summaries + gauges)"""
+        lines = []
+        with self.lock:
+            stages = list(self.stages.items())
+
+        for metric, attr, help_text in (
+            ("stage_wall_seconds", "wall", "Wall-clock time per pipeline stage"),
+            ("stage_cpu_seconds", "cpu",
+             "CPU time of the calling thread only per pipeline stage (excludes library worker threads)"),
+            ("stage_process_cpu_seconds", "process_cpu",
+             "Process-wide CPU time during each pipeline stage (includes library worker threads "
+             "and any stages running concurrently)"),
+            ("stage_rss_delta_bytes", "rss_delta",
+             "Change in process resident memory from entry to exit of each pipeline stage"),
+        ):
+            name = f"{METRICS_PREFIX}_{metric}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} summary")
+            for stage, stats in stages:
+                hist = getattr(stats, attr)
+                if not hist.count:
+                    continue
+                for q in QUANTILES:
+                    lines.append(f'{name}{{stage="{stage}",quantile="{q}"}} {hist.quantile(q):.6f}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {hist.total:.6f}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {hist.count}')
+
+        name = f"{METRICS_PREFIX}_stage_errors_total"
+        lines.append(f"# HELP {name} Stage calls that raised")
+        lines.append(f"# TYPE {name} counter")
+        for stage, stats in stages:
+            lines.append(f'{name}{{stage="{stage}"}} {stats.errors}')
+
+        name = f"{METRICS_PREFIX}_stage_max_rss_bytes"
+        lines.append(f"# HELP {name} Largest process resident memory seen at entry or exit of each pipeline stage")
+        lines.append(f"# TYPE {name} gauge")
+        for stage, stats in stages:
+            if stats.rss_delta.count:
+                lines.append(f'{name}{{stage="{stage}"}} {stats.max_rss}')
+
+        name = f"{METRICS_PREFIX}_rss_bytes"
+        lines.append(f"# HELP {name} Process resident memory now")
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {current_rss_bytes()}")
+
+        name = f"{METRICS_PREFIX}_peak_rss_bytes"
+        lines.append(f"# HELP {name} Process high-water resident memory since start (ru_maxrss)")
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {peak_rss_bytes()}")
+        return "\n".join(lines) + "\n"
+
+    def report(self):
+        """Print a per-stage table to the console"""
+        data = self.to_dict()["stages"]
+        if not data:
+            return
+        print(f"\n{'STAGE':<18} | {'CALLS':>5} | {'P50 ms':>8} | {'P95 ms':>8} | {'P99 ms':>8} | "
+              f"{'CPU P50':>8} | {'PROC P50':>8} | {'ΔRSS P95':>8}")
+        print("-" * 92)
+        mib = 1024 * 1024
+        for name, stats in data.items():
+            wall, cpu, proc = stats["wall_seconds"], stats["cpu_seconds"], stats["process_cpu_seconds"]
+            delta = stats["rss_delta_bytes"]
+            delta_mib = f"{delta['p95'] / mib:>+7.1f}M" if delta["count"] else f"{'-':>8}"
+            print(f"{name:<18} | {wall['count']:>5} | {wall['p50'] * 1000:>8.1f} | {wall['p95'] * 1000:>8.1f} | "
+                  f"{wall['p99'] * 1000:>8.1f} | {cpu['p50'] * 1000:>8.1f} | {proc['p50'] * 1000:>8.1f} | "
+                  f"{delta_mib}")
+        print(f"RSS now: {current_rss_bytes() / mib:.0f} MiB | "
+              f"process high-water: {peak_rss_bytes() / mib:.0f} MiB")
+
+    def reset(self):
+        with self.lock:
+            self.stages.clear()
+            self.profiles.clear()
+            self.started = time.time()
+
+# Process-wide registry used by every module
+METRICS = Metrics()
+stage = METRICS.stage
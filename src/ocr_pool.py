@@ -0,0 +1,126 @@
+import multiprocessing as mp
+import os
+import time
+
+from pipeline import collect_images
+from results import OCRResult
+
+# Env vars the BLAS/OpenMP backends under Paddle read for their thread count
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+# Per-process state, filled in by _init_worker
+_worker_ocr = None
+
+def _init_worker(counter, threads, pin):
+    """Runs once in each worker: pin to its own cores and build PaddleOCR"""
+    global _worker_ocr
+
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+
+    if pin and hasattr(os, "sched_setaffinity"):
+        cpus = sorted(os.sched_getaffinity(0))
+        first = (index * threads) % len(cpus)
+        cores = {cpus[(first + i) % len(cpus)] for i in range(threads)}
+        os.sched_setaffinity(0, cores)
+
+    # Imported here so the thread env vars are already in place
+    from paddleocr import PaddleOCR
+    _worker_ocr = PaddleOCR(use_textline_orientation=True, lang='en', cpu_threads=threads)
+
+def _ocr_one(item):
+    """
+    Task body: OCR one (key, path_or_image) pair in the worker's own PaddleOCR.
+    Returns (key, OCRResult, error, (wall_seconds, cpu_seconds, process_cpu_seconds)).
+    """
+    import cv2
+    from pipeline import parse_ocr_result
+
+    key, image = item
+    if isinstance(image, str):
+        image = cv2.imread(image)
+    if image is None:
+        return key, OCRResult(key), f"Image not found: {key}", (0.0, 0.0, 0.0)
+
+    # A worker runs one task at a time, so its process CPU over the call is this image's
+    starts = (time.perf_counter(), time.thread_time(), time.process_time())
+    try:
+        result = _worker_ocr.ocr(image)
+    except Exception as e:
+        return key, OCRResult(key), str(e), (0.0, 0.0, 0.0)
+    ends = (time.perf_counter(), time.thread_time(), time.process_time())
+    timing = tuple(end - start for start, end in zip(starts, ends))
+
+    return key, parse_ocr_result(result[0] if result else None, key), None, timing
+
+class OCRPool:
+    """
+    Process pool where every worker owns one PaddleOCR instance.
+    Images are pulled from the pool's shared task queue one at a time, so
+    fast workers pick up more work. Use as a context manager.
+    """
+
+    def __init__(self, workers=None, threads_per_worker=1, pin_cpus=True):
+        cpu_count = os.cpu_count() or 1
+        self.threads = max(1, threads_per_worker)
+        self.workers = workers or max(1, cpu_count // self.threads)
+        self.pin_cpus = pin_cpus
+        self.pool = None
+
+    def start(self):
+        # Spawned workers copy os.environ at start, so set the thread caps
+        # only for the duration of pool creation
+        saved = {name: os.environ.get(name) for name in THREAD_ENV_VARS}
+        for name in THREAD_ENV_VARS:
+            os.environ[name] = str(self.threads)
+
+        try:
+            ctx = mp.get_context("spawn")
+            counter = ctx.Value("i", 0)
+            self.pool = ctx.Pool(
+                processes=self.workers,
+                initializer=_init_worker,
+                initargs=(counter, self.threads, self.pin_cpus)
+            )
+        finally:
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+        print(f"✅ OCR pool started: {self.workers} workers x {self.threads} thread(s)")
+        return self
+
+    def close(self):
+        if self.pool:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def imap(self, sources):
+        """Yield (key, OCRResult) as workers finish, in completion order"""
+        for key, ocr, error, _ in self.pool.imap_unordered(_ocr_one, collect_images(sources)):
+            if error:
+                print(f"✗ OCR failed for {key}: {error}")
+            yield key, ocr
+
+    def submit(self, key, image):
+        """
+        Queue one image without waiting. .get() on the returned AsyncResult
+        gives (key, OCRResult, error, (wall_seconds, cpu_seconds, process_cpu_seconds)).
+        """
+        return self.pool.apply_async(_ocr_one, ((key, image),))
+
+    def text_extract_batch(self, sources):
+        """Same contract as MedicineApp.text_extract_batch, results in input order"""
+        items = collect_images(sources)
+        done = dict(self.imap(items))
+        return {key: done.get(key, OCRResult(key)) for key, _ in items}
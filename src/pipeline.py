@@ -1,15 +1,69 @@
-from paddleocr import PaddleOCR
 import json
-import cv2
 import os
+import threading
 import time
 
+# paddleocr and cv2 are imported on first use: together they are most of the
+# import time, and callers like the batch CLI or the server may not need them yet
+from metrics import stage
+from results import OCRLine, OCRResult
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+def parse_ocr_result(page, source=None):
+    """Turn one PaddleOCR page result into an OCRResult"""
+    extracted = OCRResult(source)
+    if not page:
+        return extracted
+
+    # PaddleOCR v2+ structure
+    rec_texts = page.get('rec_texts', [])
+    rec_scores = page.get('rec_scores', [])
+
+    for text, score in zip(rec_texts, rec_scores):
+        extracted.lines.append(OCRLine(text, float(score)))
+    return extracted
+
+def collect_images(sources):
+    """Expand a directory or a list of sources into (key, path_or_image) pairs"""
+    if isinstance(sources, str):
+        if os.path.isdir(sources):
+            names = sorted(
+                name for name in os.listdir(sources)
+                if name.lower().endswith(IMAGE_EXTENSIONS)
+            )
+            return [(os.path.join(sources, name),) * 2 for name in names]
+        return [(sources, sources)]
+
+    items = []
+    for source in sources:
+        if isinstance(source, str):
+            if os.path.isdir(source):
+                items.extend(collect_images(source))
+            else:
+                items.append((source, source))
+        else:
+            # Already decoded image, passed as (key, image)
+            items.append(tuple(source))
+    return items
+
 class MedicineApp:
     def __init__(self):
-        self.ocr = PaddleOCR(use_textline_orientation=True, lang='en')
+        self.ocr_lock = threading.Lock()
         self.current_image = None
         self.save_dir = "output"
         os.makedirs(self.save_dir, exist_ok=True)
+
+    def __getattr__(self, name):
+        # Only called while self.ocr is still unset: build PaddleOCR on first use
+        if name != "ocr":
+            raise AttributeError(name)
+        with self.ocr_lock:
+            if "ocr" not in self.__dict__:
+                with stage("load_ocr"):
+                    from paddleocr import PaddleOCR
+                    self.ocr = PaddleOCR(use_textline_orientation=True, lang='en')
+        return self.__dict__["ocr"]
     
     def precaution(self):
         """Show medical disclaimer"""
@@ -34,7 +88,10 @@ class MedicineApp:
 
     def load_image(self, image_path):
         """Load image from file path"""
-        image = cv2.imread(image_path)
+        import cv2
+
+        with stage("decode"):
+            image = cv2.imread(image_path)
         
         if image is None:
             print(f"❌ Image not found: {image_path}")
@@ -46,6 +103,8 @@ class MedicineApp:
     
     def cam_capture(self):
         """Capture image from camera - Press SPACE to capture, Q to quit"""
+        import cv2
+
         cap = cv2.VideoCapture(0)
             
         
@@ -112,48 +171,89 @@ class MedicineApp:
             else:
                 print("❌ Invalid choice. Please enter 1 or 2.")
     
-    def text_extract(self, image=None):
+    def text_extract(self, image=None, source=None, persist=False):
+        """
+        OCR one image and return an OCRResult, kept in memory for the next
+        stage. persist=True also writes it to results/text_detect/output.json.
+        """
         if image is None:
             image = self.current_image
 
         if image is None:
             print("No image available for OCR")
-            return []
+            return OCRResult(source)
 
         print("\n" + "=" * 70)
         print("Extracting text from medicine label...")
         print("=" * 70)
 
         try:
-            result = self.ocr.ocr(image)
+            with stage("ocr"):
+                result = self.ocr.ocr(image)
         except Exception as e:
             print(f"✗ Error in OCR pipeline: {e}")
-            return []
+            return OCRResult(source)
 
         if not result:
             print("No text found in image")
-            return []
-
-        # PaddleOCR v2+ structure
-        rec_texts = result[0].get('rec_texts', [])
-        rec_scores = result[0].get('rec_scores', [])
+            return OCRResult(source)
 
-        extracted = []
-        for text, score in zip(rec_texts, rec_scores):
-            extracted.append({
-                "text": text,
-                "confidence": float(score)
-            })
+        extracted = parse_ocr_result(result[0], source)
 
         print(f"\nExtracted {len(extracted)} text lines")
-        self.save_to_json(extracted)
+        if persist:
+            self.save_to_json(extracted.to_list())
 
         return extracted
-    
-    def save_to_json(self, data):
+
+    def text_extract_batch(self, sources, batch_size=8):
+        """
+        OCR many images with one warm PaddleOCR instance.
+        `sources` is a directory or a list of paths / (key, image) pairs.
+        Images are sent to PaddleOCR `batch_size` at a time.
+        Returns {source: OCRResult} in input order.
+        """
+        import cv2
+
+        items = collect_images(sources)
+        # Every key in input order up front; OCR fills them in chunk by chunk
+        results = {key: OCRResult(key) for key, _ in items}
+
+        print("\n" + "=" * 70)
+        print(f"Extracting text from {len(items)} images (batch size {batch_size})...")
+        print("=" * 70)
+
+        for start in range(0, len(items), batch_size):
+            chunk = []
+            for key, image in items[start:start + batch_size]:
+                if isinstance(image, str):
+                    with stage("decode"):
+                        image = cv2.imread(image)
+                if image is None:
+                    print(f"❌ Image not found: {key}")
+                    continue
+                chunk.append((key, image))
+
+            if not chunk:
+                continue
+
+            try:
+                with stage("ocr_batch"):
+                    batch_result = self.ocr.ocr([image for _, image in chunk])
+            except Exception as e:
+                print(f"✗ Error in OCR batch starting at {start}: {e}")
+                continue
+
+            for (key, _), page in zip(chunk, batch_result):
+                results[key] = parse_ocr_result(page, key)
+                print(f"✅ {key}: {len(results[key])} text lines")
+
+        return results
+
+    @staticmethod
+    def save_to_json(data, filepath="results/text_detect/output.json"):
         """Save OCR results to JSON"""
-        os.makedirs('results/text_detect', exist_ok=True)
-        filepath = "results/text_detect/output.json"
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
         
         with open(filepath, "w", encoding="utf-8") as f:
             json.dump(data, f, ensure_ascii=False, indent=4)
@@ -177,8 +277,8 @@ class MedicineApp:
             print("\n❌ No image provided. Exiting...")
             exit()
         
-        # Extract text from image
-        extracted_text = self.text_extract(image)
+        # Extract text from image (saved for the standalone predict.py step)
+        extracted_text = self.text_extract(image, persist=True)
         
         if extracted_text:
             print("\n✅ Processing complete!")
@@ -187,4 +287,21 @@ class MedicineApp:
 
 def process_pipe():
     app = MedicineApp()
-    app.run()
\ No newline at end of file
+    app.run()
+
+def batch_pipe(sources, batch_size=8, output="results/text_detect/batch_output.json",
+               workers=0, threads_per_worker=1):
+    """
+    Non-interactive OCR over a folder/list of images, saved as one JSON file.
+    workers > 0 spreads the images over an OCRPool of PaddleOCR processes.
+    """
+    if workers:
+        from ocr_pool import OCRPool
+        with OCRPool(workers=workers, threads_per_worker=threads_per_worker) as pool:
+            results = pool.text_extract_batch(sources)
+    else:
+        app = MedicineApp()
+        results = app.text_extract_batch(sources, batch_size=batch_size)
+
+    MedicineApp.save_to_json({key: ocr.to_list() for key, ocr in results.items()}, filepath=output)
+    return results
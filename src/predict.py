@@ -1,34 +1,83 @@
-import spacy
 import json
 import os
+import re
 import sys
+from collections import Counter
 
-# Load your trained model
-try:
-    # Make sure this points to your actual model folder
-    nlp = spacy.load("model/model-best") 
-except Exception as e:
-    print(f"❌ Error loading model: {e}")
-    sys.exit(1)
-
-# Load the OCR output
-try:
-    with open("results/text_detect/output.json", "r", encoding="utf-8") as f:
-        raw_ocr_data = json.load(f)
-except FileNotFoundError:
-    print("❌ OCR output file not found.")
-    sys.exit(1)
+from metrics import stage
+from results import Candidate, OCRResult
+from vocabulary import DECEPTIVE_WORDS, FORMS, LABEL_HEADERS, MANUFACTURERS, PHARMACY_NAMES
+
+MODEL_PATH = "model/model-best"
+OCR_OUTPUT_FILE = "results/text_detect/output.json"
+FILTER_OUTPUT_FILE = "results/filter/output_next.json"
 
 # === 🛑 THE BLOCKLIST ===
 # Words that the model might mistake for drugs, but definitely aren't.
 BLOCKLIST = {
-    "PHARMACY", "RX", "DATE", "FILLED", "QTY", "REFILL", "TAKE", "TABLET", 
+    "PHARMACY", "RX", "DATE", "FILLED", "QTY", "REFILL", "TAKE", "TABLET",
     "CAPSULE", "EVERY", "DAY", "ONCE", "TWICE", "DAILY", "ORAL", "MOUTH",
-    "CHEN", "PFIZER", "NOVARTIS", "GSK", "MERCK", "SANOFI", 
+    "CHEN", "PFIZER", "NOVARTIS", "GSK", "MERCK", "SANOFI",
     "MFG", "INC", "LTD", "CO", "PHARMA", "LABS", "PHARMACEUTICALS",
     "BAYER", "ROCHE", "ASTRAZENECA", "JOHNSON", "BRISTOL", "Prescription"
 }
 
+# Components the NER scorer actually needs; anything else in the model is disabled
+NER_COMPONENTS = ("tok2vec", "ner")
+NER_BATCH_SIZE = 64
+NER_N_PROCESS = 1
+TOP_N = 5  # Distinct drugs kept per label for the FDA lookup
+
+# === PRE-FILTER (runs before NER) ===
+# Label vocabulary that never names a drug on its own. Headers, pharmacies,
+# manufacturers, look-alike words and forms are the NER training lists
+# (vocabulary.py); the rest is common instruction/warning boilerplate. A line
+# is skipped only if EVERY word in it is listed here, so a single unknown
+# word keeps it for NER.
+PREFILTER = os.getenv("MEDID_PREFILTER", "1") == "1"
+
+COMPANY_SUFFIXES = ["Pharmaceuticals", "Labs", "Inc", "Co", "Ltd", "LLC"]
+UNITS = ["mg", "mcg", "ml", "g", "iu", "C", "F"]
+INSTRUCTIONS = [
+    "Take with food", "Take with meals", "Use as directed", "Keep refrigerated", "Shake well",
+    "Do not crush", "For external use only", "For oral use only", "Swallow whole",
+    "Keep out of reach of children", "Store in a cool dry place", "Store below",
+    "Do not exceed recommended dose", "May cause drowsiness", "Alcohol interaction",
+    "Not recommended for children under", "For questions call your doctor",
+    "Batch no", "Best before", "Warnings"
+]
+# Single words (not phrases) that show up around instructions and dates
+STOPWORDS = {
+    "a", "an", "the", "is", "and", "or", "at", "in", "on", "to", "per", "each",
+    "day", "daily", "once", "twice", "every", "hour", "hours", "times", "mouth",
+    "one", "two", "three", "four",
+    "expires", "exp", "mfd", "mfg", "refills", "signature"
+}
+
+WORD_RE = re.compile(r"[A-Za-z]+")
+LETTER_RE = re.compile(r"[A-Za-z]")
+PHONE_RE = re.compile(r"(?:\(\d{3}\)|\b\d{3})[\s.-]?\d{3}[\s.-]\d{4}\b|\b\d{3}-\d{4}\b")
+DATE_RE = re.compile(r"\b\d{1,4}[/-]\d{1,4}(?:[/-]\d{2,4})?\b|\b\d{1,2}\.\d{1,2}\.\d{2,4}\b")
+
+BOILERPLATE_WORDS = frozenset(
+    word.upper()
+    for group in (BLOCKLIST, LABEL_HEADERS, PHARMACY_NAMES, MANUFACTURERS, COMPANY_SUFFIXES,
+                  DECEPTIVE_WORDS, FORMS, UNITS, INSTRUCTIONS, STOPWORDS)
+    for phrase in group
+    for word in WORD_RE.findall(phrase)
+)
+
+def load_model(model_path=MODEL_PATH):
+    """Load the trained NER model (call once and reuse the returned nlp)"""
+    import spacy  # Heavy; only paid by callers that actually run NER
+
+    # Make sure this points to your actual model folder
+    nlp = spacy.load(model_path)
+    for name in nlp.pipe_names:
+        if name not in NER_COMPONENTS:
+            nlp.disable_pipe(name)
+    return nlp
+
 def filter_and_score(doc):
     """
     Analyzes the entities in a doc and assigns a 'quality score'.
@@ -37,100 +86,194 @@ def filter_and_score(doc):
     has_drug = False
     has_dosage = False
     drug_text = None
-    
+
     entities_found = []
-    
+
     for ent in doc.ents:
         label = ent.label_
         text = ent.text.strip()
         entities_found.append({"text": text, "label": label})
-        
+
         # Check for Drug Name
         if label == "DRUG_NAME":
             # 1. Check Blocklist (Case insensitive)
             if text.upper() in BLOCKLIST:
                 continue # Skip this, it's a bad prediction (like "Pharmacy")
-            
+
             # 2. Check length (Drugs are usually > 3 chars)
             if len(text) < 3:
                 continue
 
             if any(text.upper().endswith(suffix) for suffix in ["INC", "LTD", "CO", "LABS"]):
                 continue
-                
+
             has_drug = True
             drug_text = text
-            
+
         # Check for Dosage
         if label == "DOSAGE":
             has_dosage = True
 
     # === SCORING LOGIC ===
     score = 0
-    
+
     if has_drug and has_dosage:
         score = 3  # Gold Standard: We found a drug AND a strength (e.g. Lisinopril 5mg)
     elif has_drug:
         score = 1  # Medium: We found a drug name, but no strength (e.g. Doliprane)
     else:
         score = 0  # Garbage: Only found "Filled" or "Pharmacy" or nothing
-        
+
     return score, drug_text, entities_found
 
-# ==========================================
-# MAIN PROCESSING LOOP
-# ==========================================
-
-best_candidate = None
-highest_score = -1
-all_results = []
-
-print(f"{'ORIGINAL TEXT':<30} | {'SCORE'} | {'ENTITIES'}")
-print("-" * 70)
-
-for item in raw_ocr_data:
-    original_text = item['text']
-    
-    # Run the model
-    doc = nlp(original_text)
-    
-    # Apply our filter logic
-    score, drug_name, entities = filter_and_score(doc)
-    
-    # Log for debugging
-    print(f"{original_text[:30]:<30} | {score:<5} | {entities}")
-    
-    # Keep track of the best result found so far
-    if score > highest_score and score > 0:
-        highest_score = score
-        best_candidate = {
-            "original_text": original_text,
-            "drug_name": drug_name,
-            "entities": entities
-        }
-
-# ==========================================
-# SAVE FINAL RESULT
-# ==========================================
-
-final_output = []
-
-if best_candidate:
-    print("\n✅ BEST MATCH FOUND:")
-    print(f"   Drug: {best_candidate['drug_name']}")
-    print(f"   Source Line: {best_candidate['original_text']}")
-    
-    # Format for your next step (FDA API)
-    final_output.append({
-        "text": best_candidate['drug_name'],
-        "confidence": 1.0 # We set this to 1.0 because our NER logic validated it
-    })
-else:
-    print("\n❌ No valid medicine detected.")
-
-# Save to the filter file
-os.makedirs('results/filter', exist_ok=True)
-with open("results/filter/output_next.json", "w", encoding="utf-8") as f:
-    json.dump(final_output, f, ensure_ascii=False, indent=4)
-
-print("✓ Results saved to results/filter/output_next.json")
\ No newline at end of file
+def prefilter_reason(text):
+    """Why `text` can't contain a drug name (so NER can skip it), or None to keep it"""
+    if LETTER_RE.search(text) and any(w.upper() not in BOILERPLATE_WORDS for w in WORD_RE.findall(text)):
+        return None
+    if PHONE_RE.search(text):
+        return "phone"
+    if DATE_RE.search(text):
+        return "date"
+    if not LETTER_RE.search(text):
+        return "no_letters"
+    return "boilerplate"
+
+def prefilter_lines(texts):
+    """Split OCR lines into (kept, skipped) where skipped is [(text, reason), ...]"""
+    kept, skipped = [], []
+    with stage("prefilter"):
+        for text in texts:
+            reason = prefilter_reason(text)
+            if reason is None:
+                kept.append(text)
+            else:
+                skipped.append((text, reason))
+    return kept, skipped
+
+def score_lines(nlp, texts, batch_size=NER_BATCH_SIZE, n_process=NER_N_PROCESS):
+    """
+    Batched NER over many OCR lines with nlp.pipe.
+    Yields (text, score, drug_name, entities) in input order.
+    """
+    # Docs are materialized so NER and scoring are timed separately
+    with stage("ner"):
+        docs = list(nlp.pipe(texts, batch_size=batch_size, n_process=n_process))
+    with stage("filter_and_score"):
+        scored = [filter_and_score(doc) for doc in docs]
+    for text, (score, drug_name, entities) in zip(texts, scored):
+        yield text, score, drug_name, entities
+
+def rank_candidates(nlp, ocr, top_n=TOP_N, verbose=True,
+                    batch_size=NER_BATCH_SIZE, n_process=NER_N_PROCESS, prefilter=PREFILTER):
+    """
+    Runs the NER model over every line of an OCRResult and keeps the best
+    `top_n` distinct drug names (multi-drug labels, combination packs) as
+    Candidates. Sorted by score; ties go to the drug whose line reached that
+    score first, as with the old single-best loop.
+    With prefilter, boilerplate lines are dropped before NER and counted per
+    reason in ocr.skipped.
+    """
+    candidates = {}
+
+    if verbose:
+        print(f"{'ORIGINAL TEXT':<30} | {'SCORE'} | {'ENTITIES'}")
+        print("-" * 70)
+
+    texts = ocr.texts()
+    if prefilter:
+        texts, skipped = prefilter_lines(texts)
+        counts = Counter(reason for _, reason in skipped)
+        ocr.skipped = dict(counts.most_common())
+        if verbose:
+            for text, reason in skipped:
+                print(f"{text[:30]:<30} | {'skip':<5} | {reason}")
+            if skipped:
+                details = ", ".join(f"{reason} {n}" for reason, n in counts.most_common())
+                print(f"⏭️  Pre-filter skipped {len(skipped)}/{len(skipped) + len(texts)} lines ({details})")
+
+    # Run the model over all lines at once
+    for original_text, score, drug_name, entities in score_lines(nlp, texts, batch_size, n_process):
+
+        # Log for debugging
+        if verbose:
+            print(f"{original_text[:30]:<30} | {score:<5} | {entities}")
+
+        if score <= 0:
+            continue
+
+        # Keep the best line seen for each drug. A replaced entry is moved to
+        # the end, so dict order is the order in which each score was reached
+        key = drug_name.upper()
+        if key not in candidates or score > candidates[key].score:
+            candidates.pop(key, None)
+            candidates[key] = Candidate(drug_name, original_text, score, entities)
+
+    ranked = sorted(candidates.values(), key=lambda c: c.score, reverse=True)
+    return ranked[:top_n]
+
+def find_best_candidate(nlp, ocr, verbose=True,
+                        batch_size=NER_BATCH_SIZE, n_process=NER_N_PROCESS):
+    """
+    Keeps only the highest scoring line.
+    Returns the best Candidate, or None when no medicine was found.
+    """
+    ranked = rank_candidates(nlp, ocr, top_n=1, verbose=verbose,
+                             batch_size=batch_size, n_process=n_process)
+    return ranked[0] if ranked else None
+
+def save_candidate(candidates, filepath=FILTER_OUTPUT_FILE):
+    """
+    Save the match(es) in the format the FDA lookup step expects.
+    Accepts the best Candidate or a ranked list of them.
+    """
+    if isinstance(candidates, Candidate):
+        candidates = [candidates]
+
+    final_output = []
+
+    for candidate in candidates or []:
+        # Format for your next step (FDA API)
+        final_output.append({
+            "text": candidate.drug_name,
+            "confidence": 1.0 # We set this to 1.0 because our NER logic validated it
+        })
+
+    # Save to the filter file
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    with open(filepath, "w", encoding="utf-8") as f:
+        json.dump(final_output, f, ensure_ascii=False, indent=4)
+
+    print(f"✓ Results saved to {filepath}")
+
+def main():
+    # Load your trained model
+    try:
+        nlp = load_model()
+    except Exception as e:
+        print(f"❌ Error loading model: {e}")
+        sys.exit(1)
+
+    # Load the OCR output
+    try:
+        with open(OCR_OUTPUT_FILE, "r", encoding="utf-8") as f:
+            ocr = OCRResult.from_list(json.load(f), source=OCR_OUTPUT_FILE)
+    except FileNotFoundError:
+        print("❌ OCR output file not found.")
+        sys.exit(1)
+
+    candidates = rank_candidates(nlp, ocr)
+
+    if candidates:
+        best_candidate = candidates[0]
+        print("\n✅ BEST MATCH FOUND:")
+        print(f"   Drug: {best_candidate.drug_name}")
+        print(f"   Source Line: {best_candidate.original_text}")
+        for other in candidates[1:]:
+            print(f"   Also found: {other.drug_name} (score {other.score})")
+    else:
+        print("\n❌ No valid medicine detected.")
+
+    save_candidate(candidates)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import json
+import os
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional
+
+SCAN_RESULTS_DIR = "results/scans"
+
+@dataclass
+class OCRLine:
+    text: str
+    confidence: float
+
+@dataclass
+class OCRResult:
+    """All text lines PaddleOCR found in one image"""
+    source: Optional[str] = None
+    lines: List[OCRLine] = field(default_factory=list)
+    skipped: dict = field(default_factory=dict)  # Pre-filter reason -> lines NER never saw
+
+    @classmethod
+    def from_list(cls, data, source=None):
+        """Build from the legacy [{"text", "confidence"}, ...] JSON layout"""
+        return cls(source, [OCRLine(item["text"], float(item.get("confidence", 1.0))) for item in data])
+
+    def texts(self):
+        return [line.text for line in self.lines]
+
+    def to_list(self):
+        return [asdict(line) for line in self.lines]
+
+    def __len__(self):
+        return len(self.lines)
+
+    def __iter__(self):
+        return iter(self.lines)
+
+@dataclass
+class Candidate:
+    """One drug name the NER scorer kept, with the line it came from"""
+    drug_name: str
+    original_text: str
+    score: int
+    entities: list = field(default_factory=list)
+    corrected_from: Optional[str] = None           # NER text before fuzzy correction
+    matches: list = field(default_factory=list)    # Ranked [canonical_name, distance]
+
+    def to_dict(self):
+        return asdict(self)
+
+@dataclass
+class Label:
+    """Resolved FDA label fields plus the generated summary"""
+    query: str
+    brand_name: str
+    purpose: str
+    indications_and_usage: str
+    dosage_and_administration: str
+    summary: str
+    summarizer: str
+
+    def to_dict(self):
+        return asdict(self)
+
+@dataclass
+class ScanResult:
+    """
+    Everything one scan produced, handed from stage to stage in memory.
+    Nothing touches disk unless save() is called; each scan gets its own file.
+    """
+    scan_id: str = field(default_factory=lambda: f"{int(time.time())}_{uuid.uuid4().hex[:8]}")
+    ocr: OCRResult = field(default_factory=OCRResult)
+    candidates: List[Candidate] = field(default_factory=list)
+    labels: List[Label] = field(default_factory=list)
+    detection: Optional[list] = None  # [x1, y1, x2, y2, cls, conf] of the cropped bottle
+
+    @property
+    def candidate(self):
+        """Best NER candidate, or None"""
+        return self.candidates[0] if self.candidates else None
+
+    @property
+    def label(self):
+        """Label of the best resolved candidate, or None"""
+        return self.labels[0] if self.labels else None
+
+    def to_dict(self):
+        return {
+            "scan_id": self.scan_id,
+            "source": self.ocr.source,
+            "detection": self.detection,
+            "ocr": self.ocr.to_list(),
+            "prefilter_skipped": self.ocr.skipped,
+            "candidates": [c.to_dict() for c in self.candidates],
+            "labels": [label.to_dict() for label in self.labels]
+        }
+
+    def save(self, directory=SCAN_RESULTS_DIR):
+        """Persist this scan as <directory>/<scan_id>.json and return the path"""
+        os.makedirs(directory, exist_ok=True)
+        filepath = os.path.join(directory, f"{self.scan_id}.json")
+        with open(filepath, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=4)
+        return filepath
@@ -0,0 +1,165 @@
+import argparse
+import asyncio
+import time
+
+import cv2
+import numpy as np
+from aiohttp import web
+
+from metrics import METRICS, stage
+from service import MedIdPipeline
+
+# === SERVER SETTINGS ===
+DEFAULT_HOST = "0.0.0.0"
+DEFAULT_PORT = 8000
+DEFAULT_QUEUE_SIZE = 8   # Scans allowed to wait before we answer 429
+DEFAULT_WORKERS = 1      # One warm MedIdPipeline per worker
+DEFAULT_TIMEOUT = 60     # Seconds a client waits for its scan
+
+class ScanServer:
+    """
+    Async HTTP front-end for the mobile app's POST /scan.
+    Uploads go into a bounded queue; each worker owns one warm MedIdPipeline
+    and runs the blocking OCR/NER/lookup in a thread so the loop stays free.
+    """
+
+    def __init__(self, queue_size=DEFAULT_QUEUE_SIZE, workers=DEFAULT_WORKERS, timeout=DEFAULT_TIMEOUT):
+        self.queue_size = queue_size
+        self.workers = workers
+        self.timeout = timeout
+        self.queue = None
+        self.pipelines = []
+        self.tasks = []
+
+    async def start(self, app):
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        loop = asyncio.get_running_loop()
+        for _ in range(self.workers):
+            # Models load once here (in parallel), not per request
+            pipe = MedIdPipeline()
+            pipe.preload()
+            await loop.run_in_executor(None, pipe.wait_ready)
+            self.pipelines.append(pipe)
+            self.tasks.append(asyncio.create_task(self.worker(pipe)))
+        self.pipelines[0].startup_report()
+        print(f"✅ Scan server ready ({self.workers} worker(s), queue size {self.queue_size})")
+
+    async def stop(self, app):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        for pipe in self.pipelines:
+            pipe.close()
+
+    async def worker(self, pipe):
+        loop = asyncio.get_running_loop()
+        while True:
+            image, future, enqueued = await self.queue.get()
+            started = time.perf_counter()
+            try:
+                if not future.cancelled():
+                    result = await loop.run_in_executor(None, pipe.identify, image)
+                    if not future.cancelled():
+                        future.set_result((result, started - enqueued, time.perf_counter() - started))
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+            finally:
+                self.queue.task_done()
+
+    async def read_image(self, request):
+        """Accept either multipart form data (field 'image') or a raw image body"""
+        if request.content_type.startswith("multipart/"):
+            reader = await request.multipart()
+            async for part in reader:
+                if part.name in ("image", "file", "photo"):
+                    data = await part.read(decode=True)
+                    break
+            else:
+                return None
+        else:
+            data = await request.read()
+
+        if not data:
+            return None
+        with stage("decode"):
+            buffer = np.frombuffer(data, dtype=np.uint8)
+            return cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+
+    async def handle_scan(self, request):
+        received = time.perf_counter()
+
+        image = await self.read_image(request)
+        decoded = time.perf_counter()
+        if image is None:
+            return web.json_response({"error": "No valid image in request"}, status=400)
+
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((image, future, decoded))
+        except asyncio.QueueFull:
+            return web.json_response(
+                {"error": "Server busy, please retry"},
+                status=429,
+                headers={"Retry-After": "1"}
+            )
+
+        try:
+            result, queued, processed = await asyncio.wait_for(future, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            return web.json_response({"error": "Scan timed out"}, status=504)
+        except Exception as e:
+            return web.json_response({"error": f"Scan failed: {e}"}, status=500)
+
+        response = result.to_dict()
+        response.update({
+            "name": result.label.brand_name if result.label else (
+                result.candidate.drug_name if result.candidate else None),
+            "summary": result.label.summary if result.label else None,
+            "timing_ms": {
+                "upload_decode": round((decoded - received) * 1000, 1),
+                "queued": round(queued * 1000, 1),
+                "pipeline": round(processed * 1000, 1),
+                "total": round((time.perf_counter() - received) * 1000, 1)
+            }
+        })
+        return web.json_response(response)
+
+    async def handle_health(self, request):
+        return web.json_response({
+            "status": "ok",
+            "workers": self.workers,
+            "queued": self.queue.qsize() if self.queue else 0,
+            "queue_size": self.queue_size,
+            "fda_cache": [pipe.label_cache.stats() for pipe in self.pipelines]
+        })
+
+    async def handle_metrics(self, request):
+        """Prometheus scrape endpoint; ?format=json for the raw histograms"""
+        if request.query.get("format") == "json":
+            return web.json_response(METRICS.to_dict())
+        return web.Response(text=METRICS.to_prometheus(), content_type="text/plain", charset="utf-8")
+
+    def build_app(self):
+        app = web.Application(client_max_size=20 * 1024 * 1024)
+        app.router.add_post("/scan", self.handle_scan)
+        app.router.add_get("/health", self.handle_health)
+        app.router.add_get("/metrics", self.handle_metrics)
+        app.on_startup.append(self.start)
+        app.on_cleanup.append(self.stop)
+        return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Med-ID scan server")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    args = parser.parse_args()
+
+    server = ScanServer(queue_size=args.queue_size, workers=args.workers, timeout=args.timeout)
+    web.run_app(server.build_app(), host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import os
+import threading
+
+import api_client
+import predict
+from fda_cache import LabelCache
+from label_index import LabelIndex
+from summary_cache import SummaryCache
+from summarizer import get_summarizer
+from correct import DrugNameCorrector
+from pipeline import MedicineApp
+from metrics import METRICS, stage
+from results import ScanResult
+
+# Run the YOLO bottle detector first and OCR only the cropped bottle
+DETECT = os.getenv("MEDID_DETECT", "0") == "1"
+
+# Built on first access (or in the background by preload()); PaddleOCR is lazy inside MedicineApp
+LAZY_COMPONENTS = ("nlp", "summarizer", "corrector", "detector")
+
+class MedIdPipeline:
+    """
+    Long-lived [detect ->] OCR -> NER -> name correction -> FDA lookup pipeline.
+    PaddleOCR, the spaCy model, the summarizer and the detector are built once,
+    on first use or all at once in the background with preload(), so every
+    identify() call after warm-up only pays for inference.
+    """
+
+    def __init__(self, model_path=predict.MODEL_PATH, top_n=predict.TOP_N, correct=True, detect=DETECT):
+        self.top_n = top_n
+        self.model_path = model_path
+        self.use_corrector = correct
+        self.use_detector = detect
+        self.load_locks = {name: threading.Lock() for name in LAZY_COMPONENTS}
+        self.preload_threads = []
+        self.app = MedicineApp()
+        self.label_cache = LabelCache()
+        self.label_index = LabelIndex.open_if_exists()
+        self.summary_cache = SummaryCache()
+        self.lookup_client = api_client.LookupClient()
+
+    def __getattr__(self, name):
+        # Only reached while the component is still unset
+        if name not in LAZY_COMPONENTS:
+            raise AttributeError(name)
+        with self.__dict__["load_locks"][name]:
+            if name not in self.__dict__:
+                with stage(f"load_{name}"):
+                    setattr(self, name, getattr(self, f"build_{name}")())
+        return self.__dict__[name]
+
+    def build_nlp(self):
+        return predict.load_model(self.model_path)
+
+    def build_summarizer(self):
+        return get_summarizer(summary_cache=self.summary_cache)
+
+    def build_corrector(self):
+        # Snaps OCR typos to real names so openFDA isn't queried with garbage
+        return DrugNameCorrector() if self.use_corrector else None
+
+    def build_detector(self):
+        if not self.use_detector:
+            return None
+        from detector import BottleDetector
+        return BottleDetector()
+
+    def preload(self, ocr=True):
+        """
+        Start loading every component on its own background thread, e.g. while
+        the disclaimer is on screen. identify() only waits for what it needs.
+        ocr=False skips PaddleOCR (batch OCR running in an OCRPool instead).
+        """
+        loaders = {"ocr": lambda: self.app.ocr} if ocr else {}
+        for name in LAZY_COMPONENTS:
+            loaders[name] = lambda name=name: getattr(self, name)
+
+        for name, load in loaders.items():
+            thread = threading.Thread(target=self.preload_one, args=(name, load),
+                                      name=f"medid-load-{name}", daemon=True)
+            thread.start()
+            self.preload_threads.append(thread)
+
+    @staticmethod
+    def preload_one(name, load):
+        try:
+            load()
+        except Exception as e:
+            # Not fatal here: first real use retries and raises in the caller
+            print(f"✗ Background load of {name} failed: {e}")
+
+    def wait_ready(self, ocr=True):
+        """Block until every component is loaded; a failed load is retried and raises here"""
+        for thread in self.preload_threads:
+            thread.join()
+        if ocr:
+            self.app.ocr
+        for name in LAZY_COMPONENTS:
+            getattr(self, name)
+
+    def startup_report(self):
+        """Print how long each component took to load"""
+        stages = METRICS.to_dict()["stages"]
+        loads = {name[len("load_"):]: stats["wall_seconds"]["sum"]
+                 for name, stats in stages.items() if name.startswith("load_")}
+        if not loads:
+            return
+        print("⏱️  Startup time per component:")
+        for name, seconds in sorted(loads.items(), key=lambda item: -item[1]):
+            print(f"   {name:<12} {seconds:6.2f}s")
+
+    def identify(self, image, source=None, persist=False):
+        """
+        Run one scan. `image` is a BGR numpy array or a path to an image file.
+        Stages hand a ScanResult to each other in memory; persist=True also
+        writes it to results/scans/<scan_id>.json (one file per scan).
+        """
+        if isinstance(image, str):
+            source = source or image
+            image = self.app.load_image(image)
+
+        result = ScanResult()
+        result.ocr.source = source
+
+        with stage("scan"):
+            if image is not None and self.detector:
+                image = self.detect_stage(image, result)
+
+            if image is not None:
+                self.run_stages(image, result, source)
+
+        if persist:
+            print(f"💾 Scan saved to: {result.save()}")
+        return result
+
+    def detect_stage(self, image, result):
+        """
+        Crop the image to the detected bottle, in memory, or return None so
+        OCR is skipped when there is no detection.
+        """
+        from detector import crop
+
+        with stage("detect"):
+            bigbox = self.detector.locate(image)
+        if bigbox is None:
+            print("✗ No medicine bottle detected, skipping OCR")
+            return None
+
+        result.detection = [int(v) for v in bigbox[:5]] + [round(float(bigbox[5]), 4)]
+        return crop(image, bigbox)
+
+    def run_stages(self, image, result, source=None):
+        if self.ocr_stage(image, result, source) and self.ner_stage(result):
+            self.lookup_stage(result)
+
+    def ocr_stage(self, image, result, source=None):
+        result.ocr = self.app.text_extract(image, source=source)
+        return bool(result.ocr)
+
+    def ner_stage(self, result):
+        result.candidates = predict.rank_candidates(self.nlp, result.ocr, top_n=self.top_n)
+        if self.corrector and result.candidates:
+            result.candidates = self.corrector.correct_candidates(result.candidates)
+        return bool(result.candidates)
+
+    def lookup_stage(self, result):
+        # All candidates are resolved concurrently
+        names = [c.drug_name for c in result.candidates]
+        with stage("lookup"):
+            labels = self.lookup_client.lookup_many(names, cache=self.label_cache, index=self.label_index,
+                                                   summarizer=self.summarizer)
+        result.labels = [label for label in labels if label]
+        return bool(result.labels)
+
+    def close(self):
+        """Release the FDA session, the label cache and the index"""
+        self.lookup_client.close()
+        self.label_cache.close()
+        if self.label_index:
+            self.label_index.close()
@@ -0,0 +1,102 @@
+import os
+import re
+
+import api_client
+
+# Pick the backend with MEDID_SUMMARIZER=auto|extractive|gemini
+SUMMARIZER = os.getenv("MEDID_SUMMARIZER", "auto")
+
+MAX_BULLET_CHARS = 200
+
+# Section headings openFDA leaves at the start of a field, e.g.
+# "1 INDICATIONS AND USAGE Lisinopril is indicated..." or "Uses temporarily relieves..."
+HEADING_RE = re.compile(
+    r"^\s*(?:\d+(?:\.\d+)*\s+)?"
+    r"(?:INDICATIONS\s*(?:AND|&)\s*USAGE|DOSAGE\s*(?:AND|&)\s*ADMINISTRATION"
+    r"|PURPOSES?|USES?|DIRECTIONS)\b\s*:?\s*",
+    re.IGNORECASE
+)
+SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9(•])")
+WHITESPACE_RE = re.compile(r"\s+")
+
+class Summarizer:
+    """Interface: turn the raw FDA fields into the fixed 3-bullet summary"""
+    name = "base"
+
+    def summarize(self, drug_name, purpose, indications, dosage):
+        return self.summarize_with_backend(drug_name, purpose, indications, dosage)[0]
+
+    def summarize_with_backend(self, drug_name, purpose, indications, dosage):
+        """(summary, name of the backend that actually wrote it)"""
+        raise NotImplementedError
+
+class ExtractiveSummarizer(Summarizer):
+    """
+    Local, deterministic backend: the first sentence of each FDA field,
+    dropped into the same "• Purpose / • Indications / • Dosage" format
+    the LLM is asked for. No network, runs in microseconds.
+    """
+    name = "extractive"
+
+    def first_sentence(self, text):
+        if not text or text == "N/A":
+            return "N/A"
+
+        text = WHITESPACE_RE.sub(" ", text).strip()
+        text = HEADING_RE.sub("", text, count=1)
+        sentence = SENTENCE_END_RE.split(text, maxsplit=1)[0].strip()
+
+        if len(sentence) > MAX_BULLET_CHARS:
+            sentence = sentence[:MAX_BULLET_CHARS].rsplit(" ", 1)[0] + "…"
+        return sentence or "N/A"
+
+    def summarize_with_backend(self, drug_name, purpose, indications, dosage):
+        summary = (
+            f"• Purpose: {self.first_sentence(purpose)}\n"
+            f"• Indications: {self.first_sentence(indications)}\n"
+            f"• Dosage: {self.first_sentence(dosage)}"
+        )
+        return summary, self.name
+
+class GeminiSummarizer(Summarizer):
+    """
+    LLM backend (api_client.generate_summary). Falls back to the extractive
+    summary when the API call fails so the user still gets an answer.
+    """
+    name = "gemini"
+
+    def __init__(self, summary_cache=None, fallback=None):
+        self.summary_cache = summary_cache
+        self.fallback = fallback or ExtractiveSummarizer()
+        api_client.setup_gemini()
+
+    @property
+    def available(self):
+        return api_client.HAS_GEMINI
+
+    def summarize_with_backend(self, drug_name, purpose, indications, dosage):
+        # A fallback summary is reported under the fallback's name, not "gemini"
+        if not self.available:
+            return self.fallback.summarize_with_backend(drug_name, purpose, indications, dosage)
+
+        summary = api_client.generate_summary(drug_name, purpose, indications, dosage,
+                                              cache=self.summary_cache)
+        if summary == "Failed":
+            return self.fallback.summarize_with_backend(drug_name, purpose, indications, dosage)
+        return summary, self.name
+
+def get_summarizer(name=SUMMARIZER, summary_cache=None):
+    """
+    Build the configured backend. "auto" uses Gemini when GEMINI_KEY is set
+    and the local extractive summarizer otherwise.
+    """
+    if name == "extractive":
+        return ExtractiveSummarizer()
+    if name == "gemini":
+        return GeminiSummarizer(summary_cache=summary_cache)
+    if name == "auto":
+        if os.getenv("GEMINI_KEY"):
+            return GeminiSummarizer(summary_cache=summary_cache)
+        return ExtractiveSummarizer()
+
+    raise ValueError(f"Unknown summarizer: {name} (expected auto, extractive or gemini)")
@@ -0,0 +1,67 @@
+import hashlib
+import json
+import os
+import tempfile
+
+SUMMARY_CACHE_DIR = "results/cache/summaries"
+
+class SummaryCache:
+    """
+    Content-addressed store for generated summaries, one small file per entry.
+    The key hashes the label fields together with the model name and system
+    instruction, so editing the prompt or switching models never serves a
+    stale summary; old entries are simply never looked up again.
+    """
+
+    def __init__(self, directory=SUMMARY_CACHE_DIR):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(model, instruction, drug_name, purpose, indications, dosage):
+        payload = json.dumps(
+            [model, instruction, drug_name, purpose, indications, dosage],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def path_for(self, key):
+        # Two-level fan-out keeps directories small
+        return os.path.join(self.directory, key[:2], key + ".txt")
+
+    def get(self, key):
+        try:
+            with open(self.path_for(key), "r", encoding="utf-8") as f:
+                text = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return text
+
+    def put(self, key, text):
+        path = self.path_for(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # Write a uniquely named temp file next to the entry, then rename, so
+        # concurrent writers (threads or processes) never share a temp file
+        # and readers never see half a summary
+        fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
@@ -0,0 +1,62 @@
+# === Shared word lists ===
+# Used both to generate the NER training data (setup/spacious.py) and at
+# runtime, so the corrector and the OCR pre-filter (predict.py) see the same
+# vocabulary the model was trained on.
+
+# The drugs the NER model was trained on
+ALL_DRUGS = [
+    "Lisinopril", "Paracetamol", "Acetaminophen", "Ibuprofen", "Amoxicillin",
+    "Metformin", "Atorvastatin", "Amlodipine", "Omeprazole", "Azithromycin",
+    "Ciprofloxacin", "Cetirizine", "Loratadine", "Prednisone", "Ondansetron",
+    "Simvastatin", "Losartan", "Hydroxyzine", "Doxycycline", "Clopidogrel",
+    "Fluconazole", "Gabapentin", "Metoprolol", "Levothyroxine", "Alprazolam",
+    "Tramadol", "Clonazepam", "Escitalopram", "Furosemide", "Trazodone",
+    "Albuterol", "Pantoprazole", "Montelukast", "Fluticasone", "Sertraline",
+    "Rosuvastatin", "Aspirin", "Meloxicam", "Duloxetine", "Tamsulosin",
+    "Spironolactone", "Clindamycin", "Diclofenac", "Atenolol", "Naproxen",
+    "Methylprednisolone", "Finasteride", "Sitagliptin", "Celecoxib", "Donepezil",
+    "Oxycodone", "Hydromorphone", "Warfarin", "Apixaban", "Rivaroxaban",
+    "Insulin", "Glipizide", "Famotidine", "Hydrochlorothiazide", "Triamcinolone",
+    "Lovastatin", "Pravastatin", "Mirtazapine", "Risperidone", "Quetiapine",
+    "Olanzapine", "Aripiprazole", "Lamotrigine", "Topiramate", "Pregabalin"
+]
+
+MANUFACTURERS = [
+    "Chen", "Pfizer", "Novartis", "GSK", "Merck", "Sanofi", "Bayer", "Roche",
+    "AstraZeneca", "Johnson", "Bristol", "Teva", "Sandoz", "Mylan", "Sun",
+    "Lupin", "Aurobindo", "Cipla", "Hikma", "Amneal", "Glenmark", "Zydus",
+    "Torrent", "AbbVie", "Gilead", "Amgen", "Lilly", "Nordisk", "Boehringer",
+    "Takeda", "Viatris", "Organon", "Perrigo", "Apotex", "Bausch", "Biocon"
+]
+
+# Label header words
+LABEL_HEADERS = [
+    "Pharmacy", "Store", "Clinic", "Hospital", "Center", "Rx", "Date",
+    "Filled", "Refill", "Qty", "Quantity", "Doctor", "Patient", "Name",
+    "Address", "Phone", "Fax", "Tel", "Prescription", "Order", "Number",
+    "Discard", "Expiry", "Batch", "Lot", "NDC", "DIN", "License",
+    "Directions", "Instructions", "Dosage", "Take", "Use", "Warning",
+    "Caution", "Storage", "Keep", "Contains", "Active", "Inactive",
+    "Ingredient", "Manufactured", "Distributed", "Packaged", "By"
+]
+
+# Common pharmacy/store names (not drugs)
+PHARMACY_NAMES = [
+    "CVS", "Walgreens", "Rite Aid", "Walmart", "Target", "Kroger",
+    "Safeway", "Publix", "Costco", "Sam's Club", "Albertsons", "HEB",
+    "Duane Reade", "Health Mart", "Good Neighbor", "Medicine Shoppe"
+]
+
+# Common words that look like drugs (not drugs)
+DECEPTIVE_WORDS = [
+    "Store", "Health", "Care", "Medical", "Wellness", "Family",
+    "Community", "Express", "Plus", "Prime", "Central", "Main",
+    "Street", "Avenue", "Plaza", "Mall", "Building", "Suite",
+    "North", "South", "East", "West", "City", "Town", "Village"
+]
+
+FORMS = [
+    "tablet", "tablets", "tab", "tabs", "capsule", "capsules", "caps",
+    "syrup", "ointment", "cream", "injection", "drops", "caplet",
+    "pill", "pills", "suspension", "solution", "liquid", "gel"
+]
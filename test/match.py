@@ -1,34 +1,88 @@
 # ill be using fuzzymatching and levenshtein distance to match and filter medicine names detected
 # connect this to the pipeline.py
-import Levenshtein
 import sqlite3
+import threading
 import re
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from fuzzy import NameMatcher
 
 DB_FILE = 'meds_db.sqlite'
 MAX_TYPO_TOLERANCE = 2
+SQLITE_MAX_PARAMS = 500  # Stay well under SQLite's bound-variable limit
 
 class RuleClassifier:
 
     def __init__(self, db = DB_FILE):
         self.db_file = db
+        self.index = None
+        # One persistent read-only connection per thread instead of one per query
+        self.local = threading.local()
         if not os.path.exists(self.db_file):
             print("Database file not found. Run the setup script first")
+        else:
+            self.prepare_db()
 
-    def execute_query(self, query:  str, params: tuple = ()) -> list:
+    def prepare_db(self):
+        """One-time setup: WAL (readers never block) and an index on medicines.name"""
         conn = None
         try:
             conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            return cursor.fetchall()
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE INDEX IF NOT EXISTS medicines_name ON medicines(name)")
+            conn.commit()
         except sqlite3.Error as e:
             print(f"SQLite Error: {e}")
-            return []
         finally:
             if conn:
                 conn.close()
 
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.db_file}?mode=ro", uri=True)
+            self.local.conn = conn
+        return conn
+
+    def close(self):
+        """Close this thread's connection"""
+        conn = getattr(self.local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self.local.conn = None
+
+    def build_index(self) -> NameMatcher:
+        """Build the fuzzy-match index once from the medicines table"""
+        self.index = NameMatcher(self.get_names(), MAX_TYPO_TOLERANCE)
+        return self.index
+
+    def refresh_index(self):
+        """Call after the medicines table changes"""
+        self.index = None
+
+    def execute_query(self, query:  str, params: tuple = ()) -> list:
+        try:
+            # sqlite3 keeps a statement cache per connection, so repeated
+            # queries on the pooled connection are not re-prepared
+            cursor = self.connection().execute(query, params)
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"SQLite Error: {e}")
+            return []
+
+    def exact_matches(self, names: list) -> set:
+        """Which of `names` are in the table, in one IN (...) query per chunk"""
+        unique = list(dict.fromkeys(names))
+        found = set()
+        for start in range(0, len(unique), SQLITE_MAX_PARAMS):
+            chunk = unique[start:start + SQLITE_MAX_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            query = f"SELECT name FROM medicines WHERE name IN ({placeholders})"
+            found.update(row[0] for row in self.execute_query(query, tuple(chunk)))
+        return found
+
     def get_names(self) -> list:
         query = "SELECT name FROM medicines"
         all_names = self.execute_query(query)
@@ -37,20 +91,19 @@ class RuleClassifier:
     def classify(self, text_list: list) -> list:
 
         results = []
-        db_name = self.get_names()
+        index = self.index if self.index is not None else self.build_index()
+
+        cleaned = [text.strip().lower() for text in text_list]
+        exact = self.exact_matches(cleaned)
 
-        for text in text_list:
-            cleaned_text = text.strip().lower()
+        for text, cleaned_text in zip(text_list, cleaned):
             is_match = False
             standard_name = None
             exact_match = False
 
-            query = "SELECT name FROM medicines WHERE name = ?"
-            matches = self.execute_query(query, (cleaned_text,))
-
-            if matches:
+            if cleaned_text in exact:
                 is_match = True
-                standard_name = matches[0][0]
+                standard_name = cleaned_text
                 exact_match = True
             else:
                 check = re.split(r'\s+|-|\(|\)', cleaned_text)
@@ -59,9 +112,9 @@ class RuleClassifier:
 
                 for word in check:
                     if len(word) <= max_letter_tolerance: continue
-                    for dbstring in db_name:
-                        distance = Levenshtein.distance(word, dbstring)
-                        if distance > 0 and distance <= MAX_TYPO_TOLERANCE:
+                    # Closest name within tolerance, excluding the word itself
+                    for distance, dbstring in index.search(word):
+                        if distance > 0:
                             is_match = True
                             standard_name = dbstring
                             exact_match = False
@@ -79,7 +132,49 @@ class RuleClassifier:
             })
 
         return results
-    
+
+    def classify_batch(self, text_list: list) -> list:
+        """
+        Same results as classify(), for large batches (e.g. an archive of OCR
+        output): every distinct word is matched in one pass of rapidfuzz's
+        multi-threaded cdist instead of one search per word.
+        """
+        results = []
+        cleaned = [text.strip().lower() for text in text_list]
+        exact = self.exact_matches(cleaned)
+        max_letter_tolerance = 3
+
+        split = {}
+        for cleaned_text in cleaned:
+            if cleaned_text not in exact:
+                split[cleaned_text] = [w for w in re.split(r'\s+|-|\(|\)', cleaned_text)
+                                       if len(w) > max_letter_tolerance]
+        index = self.index if self.index is not None else self.build_index()
+        words = sorted({w for words in split.values() for w in words})
+        corrections = {word: name for word, (d, name) in index.closest_many(words, skip_exact=True).items()}
+
+        for text, cleaned_text in zip(text_list, cleaned):
+            standard_name = None
+            exact_match = cleaned_text in exact
+            if exact_match:
+                standard_name = cleaned_text
+            else:
+                for word in split[cleaned_text]:
+                    if word in corrections:
+                        standard_name = corrections[word]
+                        break
+            is_match = standard_name is not None
+
+            results.append({
+                "text": text,
+                "is_medicine": is_match,
+                "confidence": 1.0 if is_match else 0.0,
+                "standard_name": standard_name,
+                "exact_match": exact_match
+            })
+
+        return results
+
 
 if __name__ == '__main__':
 
@@ -1,100 +1,48 @@
 import cv2
-from ultralytics import YOLO
 import sys
 import os
 import time
+import threading
 from collections import deque
-import numpy as np
 
-# Load your trained model
-model = YOLO("ai/runs/detect/train5/weights/best.pt")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from detector import (CONF_THRESHOLD, CONF_THRESHOLD_IMAGE, CROP_PADDING, DETECTOR_IMGSZ, MIN_DETECTION_AREA,
+                      MIN_DETECTION_AREA_IMAGE, STABILITY_FRAMES, apply_nms, crop, is_stable_detection, load_yolo)
+
+# Load your trained model (backend from MEDID_DETECTOR_BACKEND: torch, onnx, onnx-int8, openvino, openvino-int8)
+model = load_yolo()
 
 cap = cv2.VideoCapture(0)
 save_dir = "output"
 os.makedirs(save_dir, exist_ok=True)
 
-# Configuration
-CONF_THRESHOLD = 0.75  # For video stream
-CONF_THRESHOLD_IMAGE = 0.60  # Lower threshold for static images
-MIN_DETECTION_AREA = 5000  # For video stream
-MIN_DETECTION_AREA_IMAGE = 2000  # Lower threshold for static images
-STABILITY_FRAMES = 5  # Number of consecutive frames needed for stable detection
+# Configuration (detection thresholds and STABILITY_FRAMES are shared with src/detector.py)
 COOLDOWN_SECONDS = 3  # Cooldown between saves
+TARGET_INFERENCE_FPS = 5  # Detection rate; the camera is read at full speed regardless
+MOTION_THRESHOLD = 6.0  # Mean abs. grey-level change (0-255) on the thumbnail that counts as motion
+MOTION_THUMB_SIZE = (64, 48)  # Downscaled frame used by the motion gate
+MOTION_MAX_SKIP_SECONDS = 2.0  # Re-run YOLO at least this often, even on a still scene
+JOIN_TIMEOUT_SECONDS = 2.0  # Wait this long for the worker threads on exit
 
 # Tracking variables
 detection_history = deque(maxlen=STABILITY_FRAMES)
 last_save_time = 0
 last_class_detected = None
 
-def calculate_iou(box1, box2):
-    """Calculate Intersection over Union between two boxes"""
-    x1_1, y1_1, x2_1, y2_1 = box1
-    x1_2, y1_2, x2_2, y2_2 = box2
-    
-    # Calculate intersection area
-    x_left = max(x1_1, x1_2)
-    y_top = max(y1_1, y1_2)
-    x_right = min(x2_1, x2_2)
-    y_bottom = min(y2_1, y2_2)
-    
-    if x_right < x_left or y_bottom < y_top:
-        return 0.0
-    
-    intersection_area = (x_right - x_left) * (y_bottom - y_top)
-    
-    # Calculate union area
-    box1_area = (x2_1 - x1_1) * (y2_1 - y1_1)
-    box2_area = (x2_2 - x1_2) * (y2_2 - y1_2)
-    union_area = box1_area + box2_area - intersection_area
-    
-    return intersection_area / union_area if union_area > 0 else 0
-
-def is_stable_detection(current_box, history, iou_threshold=0.6):
-    """Check if detection is stable across frames"""
-    if len(history) < STABILITY_FRAMES:
-        return False
-    
-    # Check if all recent detections are of the same class
-    classes = [h[4] for h in history]
-    if len(set(classes)) > 1:
-        return False
-    
-    # Check if boxes are stable (high IoU with each other)
-    for prev_box in history:
-        if calculate_iou(current_box[:4], prev_box[:4]) < iou_threshold:
-            return False
-    
-    return True
-
-def apply_nms_custom(boxes, iou_threshold=0.5):
-    """Apply Non-Maximum Suppression to remove overlapping boxes"""
-    if len(boxes) == 0:
-        return []
-    
-    # Sort by confidence
-    boxes = sorted(boxes, key=lambda x: x[5], reverse=True)
-    
-    keep = []
-    while len(boxes) > 0:
-        keep.append(boxes[0])
-        boxes = [box for box in boxes[1:] 
-                if calculate_iou(keep[-1][:4], box[:4]) < iou_threshold]
-    
-    return keep
-
-def run_model(frame, debug_mode=False, use_image_thresholds=False):
+def detect(frame, debug_mode=False, use_image_thresholds=False):
+    """Run YOLO + filtering + NMS + stability on a frame. Does not draw."""
     global detection_history, last_save_time, last_class_detected
-    
+
     # Use different thresholds for static images
     conf_thresh = CONF_THRESHOLD_IMAGE if use_image_thresholds else CONF_THRESHOLD
     area_thresh = MIN_DETECTION_AREA_IMAGE if use_image_thresholds else MIN_DETECTION_AREA
-    
+
     # Run inference with lower confidence threshold for initial filtering
-    results = model(frame, imgsz=320, conf=0.5, iou=0.4)
-    
+    results = model(frame, imgsz=DETECTOR_IMGSZ, conf=0.5, iou=0.4, verbose=False)
+
     all_detections = []
     rejected_detections = []
-    
+
     # Collect all valid detections
     for r in results:
         for box in r.boxes:
@@ -102,10 +50,10 @@ def run_model(frame, debug_mode=False, use_image_thresholds=False):
             x1, y1, x2, y2 = map(int, box.xyxy[0])
             area = (x2 - x1) * (y2 - y1)
             cls = int(box.cls[0])
-            
+
             # Debug: Track why detections are rejected
             rejection_reason = None
-            
+
             # Apply stricter confidence threshold
             if conf <= conf_thresh:
                 rejection_reason = f"Low confidence: {conf:.3f} <= {conf_thresh}"
@@ -114,51 +62,57 @@ def run_model(frame, debug_mode=False, use_image_thresholds=False):
                 rejection_reason = f"Small area: {area}px <= {area_thresh}px"
             else:
                 all_detections.append((x1, y1, x2, y2, cls, conf))
-            
+
             if rejection_reason and debug_mode:
                 rejected_detections.append((model.names[cls], conf, area, rejection_reason))
-    
+
     # Print rejection reasons in debug mode
     if debug_mode and rejected_detections:
         print("\n[DEBUG] Rejected detections:")
         for name, conf, area, reason in rejected_detections:
             print(f"  ❌ {name}: {reason}")
-    
+
     if debug_mode:
         print(f"[DEBUG] Passed filters: {len(all_detections)} detections")
-    
+
     # Apply custom NMS to remove overlapping detections
-    filtered_detections = apply_nms_custom(all_detections)
-    
+    filtered_detections = apply_nms(all_detections)
+
     # Find the largest detection
     bigbox = None
     max_area = 0
-    
+
     for detection in filtered_detections:
         x1, y1, x2, y2, cls, conf = detection
         area = (x2 - x1) * (y2 - y1)
         if area > max_area:
             max_area = area
             bigbox = detection
-    
-    # Draw all filtered detections
+
+    # Check for stable detection
+    is_stable = False
+    if bigbox:
+        detection_history.append(bigbox)
+        is_stable = is_stable_detection(bigbox, detection_history)
+    else:
+        detection_history.clear()
+
+    return bigbox, is_stable, filtered_detections
+
+def draw_detections(frame, filtered_detections, bigbox, is_stable, fps_text=None):
+    """Draw boxes, stability and settings on the frame (in place)"""
     for detection in filtered_detections:
         x1, y1, x2, y2, cls, conf = detection
         color = (0, 255, 0) if detection == bigbox else (255, 0, 0)
         thickness = 2 if detection == bigbox else 1
-        
+
         label = f"{model.names[cls]} {conf:.2f}"
         cv2.rectangle(frame, (x1, y1), (x2, y2), color, thickness)
         cv2.putText(frame, label, (x1, y1 - 10),
         cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
-    
-    # Check for stable detection
-    is_stable = False
+
+    # Add stability indicator
     if bigbox:
-        detection_history.append(bigbox)
-        is_stable = is_stable_detection(bigbox, detection_history)
-        
-        # Add stability indicator
         if is_stable:
             cv2.putText(frame, "STABLE", (10, 30),
             cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
@@ -166,16 +120,22 @@ def run_model(frame, debug_mode=False, use_image_thresholds=False):
             remaining = STABILITY_FRAMES - len(detection_history)
             cv2.putText(frame, f"Stabilizing... {remaining}", (10, 30),
             cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 165, 255), 2)
-    else:
-        detection_history.clear()
-    
+
     # Show confidence threshold info
-    cv2.putText(frame, f"Conf: {CONF_THRESHOLD:.2f} | Area: {MIN_DETECTION_AREA}", 
+    cv2.putText(frame, f"Conf: {CONF_THRESHOLD:.2f} | Area: {MIN_DETECTION_AREA}",
             (10, frame.shape[0] - 10),
             cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-    
-    cv2.imshow("YOLO Detection", frame)
-    
+
+    if fps_text:
+        cv2.putText(frame, fps_text, (10, 60),
+        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 0), 1)
+
+def run_model(frame, debug_mode=False, use_image_thresholds=False):
+    """Detect, draw and show in one call (static image mode)"""
+    bigbox, is_stable, filtered_detections = detect(frame, debug_mode, use_image_thresholds)
+    display = frame.copy()
+    draw_detections(display, filtered_detections, bigbox, is_stable)
+    cv2.imshow("YOLO Detection", display)
     return bigbox, is_stable
 
 def save_detection(frame, bigbox, bypass_cooldown=False):
@@ -190,17 +150,8 @@ def save_detection(frame, bigbox, bypass_cooldown=False):
         print(f"Cooldown active. Wait {COOLDOWN_SECONDS - (current_time - last_save_time):.1f}s")
         return False
     
-    # Save cropped image
-    crop = frame[y1:y2, x1:x2]
-    
-    # Add padding to crop for better context (optional)
-    padding = 20
-    h, w = frame.shape[:2]
-    y1_pad = max(0, y1 - padding)
-    y2_pad = min(h, y2 + padding)
-    x1_pad = max(0, x1 - padding)
-    x2_pad = min(w, x2 + padding)
-    crop_padded = frame[y1_pad:y2_pad, x1_pad:x2_pad]
+    # Save the padded crop for better context
+    crop_padded = crop(frame, bigbox, CROP_PADDING)
     
     # Save with class name in filename
     class_name = model.names[cls]
@@ -213,78 +164,227 @@ def save_detection(frame, bigbox, bypass_cooldown=False):
     print(f"✅ Saved: {filename}")
     return True
 
+class LatestFrame:
+    """
+    Single-slot frame buffer. The writer overwrites the slot, so a slow reader
+    always gets the newest frame and stale frames are dropped, never queued.
+    """
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.item = None
+        self.seq = 0
+        self.closed = False
+
+    def put(self, item):
+        with self.cond:
+            self.item = item
+            self.seq += 1
+            self.cond.notify_all()
+
+    def get(self, last_seq=0, timeout=1.0):
+        """Wait for something newer than last_seq. Returns (seq, item) or (last_seq, None)."""
+        with self.cond:
+            self.cond.wait_for(lambda: self.seq > last_seq or self.closed, timeout=timeout)
+            if self.seq > last_seq:
+                return self.seq, self.item
+            return last_seq, None
+
+    def peek(self):
+        with self.cond:
+            return self.seq, self.item
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+class RateCounter:
+    """Events per second over a sliding window"""
+
+    def __init__(self, window=30):
+        self.times = deque(maxlen=window)
+
+    def tick(self):
+        self.times.append(time.perf_counter())
+
+    def rate(self):
+        if len(self.times) < 2:
+            return 0.0
+        return (len(self.times) - 1) / (self.times[-1] - self.times[0])
+
+class MotionGate:
+    """
+    Cheap change detector: compares a blurred grey thumbnail of each frame
+    with the one from the last frame YOLO actually ran on.
+    """
+
+    def __init__(self, threshold=MOTION_THRESHOLD, max_skip=MOTION_MAX_SKIP_SECONDS):
+        self.threshold = threshold
+        self.max_skip = max_skip
+        self.reference = None
+        self.reference_time = 0
+        self.checked = 0
+        self.skipped = 0
+
+    def thumbnail(self, frame):
+        small = cv2.resize(frame, MOTION_THUMB_SIZE, interpolation=cv2.INTER_AREA)
+        grey = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(grey, (5, 5), 0)
+
+    def changed(self, frame, force=False):
+        """
+        True if the frame needs inference; it then becomes the new reference.
+        force always runs inference but still refreshes the reference.
+        """
+        self.checked += 1
+        thumb = self.thumbnail(frame)
+        now = time.perf_counter()
+
+        if not force and self.reference is not None and now - self.reference_time < self.max_skip:
+            if cv2.absdiff(thumb, self.reference).mean() < self.threshold:
+                self.skipped += 1
+                return False
+
+        self.reference = thumb
+        self.reference_time = now
+        return True
+
+def capture_loop(cap, frames, stop, capture_fps):
+    """Capture thread: read the camera as fast as it delivers into the latest-frame slot"""
+    while not stop.is_set():
+        ret, frame = cap.read()
+        if not ret:
+            print("❌ Camera stopped delivering frames")
+            stop.set()
+            break
+        frames.put(frame)
+        capture_fps.tick()
+    frames.close()
+
+def inference_loop(frames, detections, stop, inference_fps, gate, target_fps=TARGET_INFERENCE_FPS):
+    """
+    Inference worker: detect on the newest frame, at most target_fps times a
+    second. The motion gate only throttles idle or already-stable scenes:
+    while a bottle is in view but not yet stable every frame is inferred, so
+    STABILITY_FRAMES fill at the inference rate rather than once per
+    MOTION_MAX_SKIP_SECONDS.
+    """
+    interval = 1.0 / target_fps if target_fps > 0 else 0.0
+    last_seq = 0
+    bigbox, is_stable, filtered_detections = None, False, []
+    while not stop.is_set():
+        started = time.perf_counter()
+        last_seq, frame = frames.get(last_seq)
+        if frame is None:
+            continue
+
+        # Skipped frames reuse the last result and leave detection_history
+        # alone, so only real inferences count towards STABILITY_FRAMES
+        settling = bigbox is not None and not is_stable
+        if gate.changed(frame, force=settling):
+            bigbox, is_stable, filtered_detections = detect(frame)
+            inference_fps.tick()
+        detections.put((frame, bigbox, is_stable, filtered_detections))
+
+        # Throttle: don't burn CPU on frames beyond the target rate
+        remaining = interval - (time.perf_counter() - started)
+        if remaining > 0:
+            stop.wait(remaining)
+    detections.close()
+
+def static_image_mode():
+    """Camera unavailable: run once on an uploaded image with relaxed thresholds"""
+    print("❌ Camera not detected")
+    ans = input("Upload image instead? (Y/N): ").strip().lower()
+
+    if ans != "y":
+        print("Exiting...")
+        sys.exit()
+
+    image_path = input("Enter image path: ").strip()
+    frame = cv2.imread(image_path)
+
+    if frame is None:
+        print("❌ Image not found")
+        sys.exit()
+
+    bigbox, is_stable = run_model(frame, debug_mode=True, use_image_thresholds=True)  # Use relaxed thresholds
+    if bigbox:
+        # For static images, bypass stability check
+        print(f"📸 Static image mode - saving without stability check")
+        save_detection(frame, bigbox, bypass_cooldown=True)
+    else:
+        print("❌ No valid detections found")
+    cv2.waitKey(0)
+    cv2.destroyAllWindows()
+    sys.exit()
+
 # Main loop
 print("Starting detection...")
 print(f"Settings: Confidence={CONF_THRESHOLD}, MinArea={MIN_DETECTION_AREA}, Stability={STABILITY_FRAMES} frames")
+print(f"Inference target: {TARGET_INFERENCE_FPS} FPS (camera capture runs on its own thread)")
 print("Press 'q' to quit, 's' to force save, 'c' to adjust confidence")
 
-while True:
-    ret, frame = cap.read()
-    
-    if not ret:
-        print("❌ Camera not detected")
-        ans = input("Upload image instead? (Y/N): ").strip().lower()
-        
-        if ans == "n":
-            print("Exiting...")
-            sys.exit()
-        elif ans == "y":
-            image_path = input("Enter image path: ").strip()
-            frame = cv2.imread(image_path)
-            
-            if frame is None:
-                print("❌ Image not found")
-                sys.exit()
-            else:
-                bigbox, is_stable = run_model(frame, debug_mode=True, use_image_thresholds=True)  # Use relaxed thresholds
-                if bigbox:
-                    # For static images, bypass stability check
-                    print(f"📸 Static image mode - saving without stability check")
-                    x1, y1, x2, y2, cls, conf = bigbox
-                    crop = frame[y1:y2, x1:x2]
-                    
-                    # Add padding
-                    padding = 20
-                    h, w = frame.shape[:2]
-                    y1_pad = max(0, y1 - padding)
-                    y2_pad = min(h, y2 + padding)
-                    x1_pad = max(0, x1 - padding)
-                    x2_pad = min(w, x2 + padding)
-                    crop_padded = frame[y1_pad:y2_pad, x1_pad:x2_pad]
-                    
-                    class_name = model.names[cls]
-                    filename = f"{class_name}_{int(time.time())}_conf{conf:.2f}.jpg"
-                    filepath = os.path.join(save_dir, filename)
-                    cv2.imwrite(filepath, crop_padded)
-                    print(f"✅ Saved: {filename}")
-                else:
-                    print("❌ No valid detections found")
-                cv2.waitKey(0)
-                cv2.destroyAllWindows()
-                sys.exit()
-    else:
-        bigbox, is_stable = run_model(frame)
-        
-        key = cv2.waitKey(1) & 0xFF
-        
-        if key == ord("q"):
-            break
-        elif key == ord("s") and bigbox:
-            # Force save
-            save_detection(frame, bigbox)
-        elif key == ord("c"):
-            # Adjust confidence threshold
-            new_conf = input("Enter new confidence threshold (0.0-1.0): ")
-            try:
-                CONF_THRESHOLD = float(new_conf)
-                print(f"Confidence threshold set to {CONF_THRESHOLD}")
-            except:
-                print("Invalid input")
-        
+ret, first_frame = cap.read()
+if not ret:
+    static_image_mode()
+
+frames = LatestFrame()
+detections = LatestFrame()
+stop = threading.Event()
+capture_fps = RateCounter()
+inference_fps = RateCounter()
+gate = MotionGate()
+frames.put(first_frame)
+
+workers = [
+    threading.Thread(target=capture_loop, args=(cap, frames, stop, capture_fps), daemon=True),
+    threading.Thread(target=inference_loop, args=(frames, detections, stop, inference_fps, gate), daemon=True),
+]
+for worker in workers:
+    worker.start()
+
+# Display/keyboard stay on the main thread (required by cv2.imshow on most platforms)
+last_shown = 0
+while not stop.is_set():
+    seq, result = detections.get(last_shown, timeout=0.05)
+    if result is not None:
+        last_shown = seq
+        frame, bigbox, is_stable, filtered_detections = result
+        display = frame.copy()
+        fps_text = f"Capture: {capture_fps.rate():.1f} FPS | Inference: {inference_fps.rate():.1f} FPS"
+        draw_detections(display, filtered_detections, bigbox, is_stable, fps_text)
+        cv2.imshow("YOLO Detection", display)
+
         # Auto-save only if detection is stable
         if bigbox and is_stable:
             save_detection(frame, bigbox)
 
+    key = cv2.waitKey(1) & 0xFF
+
+    if key == ord("q"):
+        break
+    elif key == ord("s"):
+        # Force save the latest detection
+        _, latest = detections.peek()
+        if latest and latest[1]:
+            save_detection(latest[0], latest[1])
+    elif key == ord("c"):
+        # Adjust confidence threshold
+        new_conf = input("Enter new confidence threshold (0.0-1.0): ")
+        try:
+            CONF_THRESHOLD = float(new_conf)
+            print(f"Confidence threshold set to {CONF_THRESHOLD}")
+        except:
+            print("Invalid input")
+
+stop.set()
+# Let the capture thread finish its cap.read() before the camera is released
+for worker in workers:
+    worker.join(timeout=JOIN_TIMEOUT_SECONDS)
+print(f"📊 Achieved: capture {capture_fps.rate():.1f} FPS, inference {inference_fps.rate():.1f} FPS")
+print(f"📊 Motion gate skipped {gate.skipped} of {gate.checked} frames")
 cap.release()
 cv2.destroyAllWindows()
-print("Detection stopped")
\ No newline at end of file
+print("Detection stopped")